@@ -0,0 +1,59 @@
+''' Measures how long it takes to import chichitk
+
+    Each case runs in a new interpreter so that nothing is imported already.
+    The eager case imports every widget module, which is what `import chichitk`
+    did before widgets were imported lazily. Heavy dependencies that each case
+    loads are listed after its time.
+
+    Usage: python benchmarks/import_time.py [repeats]
+'''
+import subprocess
+import statistics
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ['numpy', 'cv2', 'PIL.ImageTk', 'fitz']
+
+EAGER = '''import chichitk
+for module in sorted(set(chichitk._modules.values())):
+    __import__(f'chichitk.{module}')'''
+
+CASES = [
+    ('eager (every module)', EAGER),
+    ('import chichitk', 'import chichitk'),
+    ('chichitk.CheckEntry', 'import chichitk; chichitk.CheckEntry'),
+    ('chichitk.CollapseFrame', 'import chichitk; chichitk.CollapseFrame'),
+    ('chichitk.Timer', 'import chichitk; chichitk.Timer'),
+    ('chichitk.IconButton', 'import chichitk; chichitk.IconButton'),
+    ('chichitk.PdfDisplay', 'import chichitk; chichitk.PdfDisplay'),
+]
+
+TEMPLATE = '''import sys, time, warnings
+warnings.simplefilter('ignore')
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(elapsed, ','.join(m for m in {heavy!r} if m in sys.modules))'''
+
+
+def run_case(code:str) -> tuple:
+    '''returns (seconds, loaded heavy modules) of code run in a new interpreter'''
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    result = subprocess.run([sys.executable, '-c', TEMPLATE.format(code=code, heavy=HEAVY)],
+                            env=env, capture_output=True, text=True, check=True)
+    seconds, _, loaded = result.stdout.strip().splitlines()[-1].partition(' ') # last line - libraries may print
+    return float(seconds), loaded
+
+def main(repeats:int=5):
+    '''prints median import time of each case'''
+    print(f'{"case":<26}{"median ms":>10}{"min ms":>10}   heavy modules loaded')
+    for label, code in CASES:
+        runs = [run_case(code) for _ in range(repeats)]
+        times = [seconds * 1000 for seconds, _ in runs]
+        print(f'{label:<26}{statistics.median(times):>10.1f}{min(times):>10.1f}   {runs[-1][1] or "-"}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -1,29 +1,73 @@
 __version__ = "0.0.5"
 
-# Import widgets
-from .aspect_frame import *
-from .buttons import *
-from .collapse_frame import CollapseFrame
-from .dropdowns import *
-from .entry_boxes import *
-from .file_dialog import *
-from .function_progress import *
-from .icon_labels import *
-from .label_dropdown import *
-from .labels import *
-from .pdf_display import PdfDisplay
-from .player import *
-from .progress_bar import *
-from .scrollable_frame import *
-from .sliders import *
-from .temp_label import *
-from .temp_menu import *
-from .text_boxes import *
-from .timer import *
-from .tool_frame import *
-from .tool_tip import *
-
-# not importing from .canvas_items because these are not intended
+from importlib import import_module as _import_module
+
+# Widgets are imported from their module when they are first used (PEP 562),
+# so that `import chichitk` does not load numpy, Pillow, OpenCV and PyMuPDF
+# for applications that only use widgets that do not need them.
+# When adding a widget, add it to its module here.
+_exports = {
+    'aspect_frame': ['AspectFrame'],
+    'async_loop': ['async_mainloop'],
+    'buttons': ['BaseButton', 'IconButton', 'ToggleIconButton', 'DoubleIconButton', 'CheckButton',
+                'LabelButton', 'ToggleLabelButton', 'ToggleButtonGroup', 'CheckButtonGroup',
+                'PlayerButtons'],
+    'collapse_frame': ['CollapseFrame'],
+    'dropdowns': ['OptionMenu', 'BasicDropDown', 'NumberDropDown', 'TuningDropDown', 'KeyDropDown',
+                  'MeterDropDown'],
+    'entry_boxes': ['CheckEntry', 'ColorEntry'],
+    'file_dialog': ['FileDialog'],
+    'frame_buffer': ['FrameBuffer'],
+    'function_progress': ['FunctionProgress'],
+    'icon_cache': ['IconCache', 'hex_to_rgb', 'image_replace_colors'], # functions used to be imported from buttons
+    'icon_labels': ['Icon', 'CheckIcon', 'CheckLabel', 'IconCheckLabel'],
+    'label_dropdown': ['LabelDropdown'],
+    'labels': ['EditLabel', 'NumberEditLabel', 'TimeEditLabel', 'RangeLabel', 'NumberIncrementLabel'],
+    'pdf_display': ['PdfDisplay'],
+    'player': ['Player'],
+    'progress_bar': ['ProgressBar'],
+    'scrollable_frame': ['ScrollableFrame'],
+    'sliders': ['Slider', 'TimeSlider', 'HorizontalSlider', 'VerticalSlider', 'ScrollBar',
+                'HorizontalSliderGroup', 'VerticalSliderGroup', 'PlotScrollBar', 'DoubleScrollBar',
+                'brighten'],
+    'temp_label': ['TempLabel'],
+    'temp_menu': ['TempMenu'],
+    'text_boxes': ['consecutive_spaces', 'TextBox'],
+    'timer': ['TimerScheduler', 'StepStream', 'Timer'],
+    'tool_frame': ['ToolFrame'],
+    'tool_tip': ['add_line_breaks', 'ToolTip'],
+    'video_player': ['VideoDecoder', 'VideoPlayer'],
+}
+
+# not exporting from .canvas_items because these are not intended
 # to be used outside of chichitk
 
-# not importing from .icons because this just contains icons as arrays
\ No newline at end of file
+# not exporting from .icons because this just contains icons as arrays
+# - use `from chichitk.icons import icons`. chichitk.icons is the icon mapping,
+# as it was when it leaked through `from .buttons import *` - importing it
+# is cheap because icons are only read and decoded when they are used
+from .icons import icons
+
+_modules = {name:module for module, names in _exports.items() for name in names}
+
+# every submodule was imported with the package before widgets were imported lazily
+_submodules = set(_exports) | {'canvas_items', 'decimate', 'icon_cache', 'pdf_render', 'pdf_search'}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name:str):
+    '''imports module of name when it is first used - the name is then kept
+    in the package so that this is only called once for each name
+    submodules such as chichitk.sliders are imported when first used as well'''
+    if name in _submodules:
+        return _import_module(f'.{name}', __name__) # import sets it as an attribute of the package
+    module = _modules.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _submodules)
@@ -0,0 +1,36 @@
+from tkinter import Tk, TclError
+import asyncio
+
+__all__ = ['async_mainloop']
+
+
+async def async_mainloop(root:Tk, interval:float=0.005):
+    '''
+    Purpose
+    -------
+        runs the Tk event loop as a coroutine so that Tk and asyncio share one
+        thread - use instead of root.mainloop()
+        widgets can be updated directly from coroutines, and Timer or Player
+        created with loop=asyncio.get_running_loop() call their callbacks on
+        this thread
+
+    Parameters
+    ----------
+        :param root: tk.Tk - main window - coroutine returns when it is destroyed
+        :param interval: float - seconds between processing Tk events
+
+    Example
+    -------
+        async def main():
+            app = Tk()
+            ... # create widgets
+            await async_mainloop(app)
+
+        asyncio.run(main())
+    '''
+    while True:
+        try:
+            root.update()
+        except TclError: # root has been destroyed
+            return
+        await asyncio.sleep(interval)
@@ -1,22 +1,9 @@
-import cv2, os
 import numpy as np
-from PIL import Image, ImageTk
 from tkinter import Frame, Button, Label
 
 from .tool_tip import ToolTip
 from .icons import icons
-
-
-def hex_to_rgb(hex_code:str):
-    '''converts hex code to uint8 rgb'''
-    return tuple([int(h, 16) for h in (hex_code[1:3], hex_code[3:5], hex_code[5:])])
-
-def image_replace_colors(img:np.array, colors_list:list):
-    '''replaces all white pixels (255, 255, 255) in img with color
-        :param colors_list: list[tuple(str, str)] - hex codes'''
-    for value, replace in colors_list:
-        img[np.all(img == hex_to_rgb(value), axis=-1)] = hex_to_rgb(replace)
-    return img
+from .icon_cache import IconCache, hex_to_rgb, image_replace_colors
 
 
 class BaseButton(Frame):
@@ -196,6 +183,9 @@ class IconButton(BaseButton):
         Given the path to a black and white .png file, the foreground and
         background color (set specifically for each hover/select status) can
         be changed with **kwargs passed to BaseButton
+
+        Recolored icons are shared with every other IconButton that shows the
+        same icon in the same colors (see IconCache)
     '''
     def __init__(self, master, icon_path:str, command, label:str='', bar_height:int=3, **kwargs):
         '''
@@ -220,22 +210,20 @@ class IconButton(BaseButton):
         
         # Load icon
         if isinstance(icon_path, str): # path to image
-            assert len(icon_path) > 4, f'IconButton Error: Invalid path: {icon_path}'
-            assert icon_path[-4:] == '.png', f'IconButton Error: icon_path is not a .png file: {icon_path}'
-            assert os.path.exists(icon_path), f'IconButton Error: Path to .png file does not exist: {icon_path}'
-            self.base_img = cv2.imread(icon_path)
+            self.base_img = IconCache.get().load(icon_path)
         elif isinstance(icon_path, np.ndarray): # 3d numpy array
             self.base_img = icon_path
         else:
             raise TypeError(f'Invalid icon input to IconButton: {icon_path}')
 
-        # Create Icons
+        # Create Icons - shared with other buttons through IconCache
+        states = [[0, 0], [0, 1], [1, 0], [1, 1]]
+        colors = [(self.fg_colors[x][y], self.bg_colors[x][y]) for x, y in states] + [(self.off_fg, self.bg_colors[0][0])]
+        images = IconCache.get().acquire_many(self.base_img, colors, self.icon_frame)
         self.images = [[None, None], [None, None]]
-        for x, y in [[0, 0], [0, 1], [1, 0], [1, 1]]:
-            temp_img = image_replace_colors(self.base_img.copy(), [('#ffffff', self.fg_colors[x][y]), ('#000000', self.bg_colors[x][y])])
-            self.images[x][y] = ImageTk.PhotoImage(image=Image.fromarray(temp_img), master=self.icon_frame)
-        off_img = image_replace_colors(self.base_img.copy(), [('#ffffff', self.off_fg), ('#000000', self.bg_colors[0][0])])
-        self.off_icon = ImageTk.PhotoImage(image=Image.fromarray(off_img), master=self.icon_frame)
+        for (x, y), image in zip(states, images):
+            self.images[x][y] = image
+        self.off_icon = images[-1]
 
         self.config_colors()
 
@@ -260,14 +248,16 @@ class IconButton(BaseButton):
         selected : bool - selected color
         hover : bool - hover color
         '''
-        if which == 'bg':
-            self.bg_colors[selected][hover] = color
-            temp_img = image_replace_colors(self.base_img.copy(), [('#ffffff', self.fg_colors[selected][hover]), ('#000000', color)])
-            self.images[selected][hover] = ImageTk.PhotoImage(image=Image.fromarray(temp_img), master=self.icon_frame)
-        elif which == 'fg':
-            self.fg_colors[selected][hover] = color
-            temp_img = image_replace_colors(self.base_img.copy(), [('#ffffff', color), ('#000000', self.bg_colors[selected][hover])])
-            self.images[selected][hover] = ImageTk.PhotoImage(image=Image.fromarray(temp_img), master=self.icon_frame)
+        if which in ['bg', 'fg']:
+            if which == 'bg':
+                self.bg_colors[selected][hover] = color
+            else:
+                self.fg_colors[selected][hover] = color
+            cache = IconCache.get()
+            old_image = self.images[selected][hover]
+            self.images[selected][hover] = cache.acquire(self.base_img, self.fg_colors[selected][hover],
+                                                         self.bg_colors[selected][hover], self.icon_frame)
+            cache.release(old_image)
         elif which == 'bar':
             self.bar_colors[selected][hover] = color
         self.config_colors()
@@ -276,6 +266,14 @@ class IconButton(BaseButton):
         '''returns button label'''
         return self.label_text
 
+    def destroy(self):
+        '''releases shared icons before destroying widget'''
+        cache = IconCache.get()
+        for image in [self.images[0][0], self.images[0][1], self.images[1][0], self.images[1][1], self.off_icon]:
+            cache.release(image)
+        self.images, self.off_icon = [[None, None], [None, None]], None # released once
+        super().destroy()
+
 class ToggleIconButton(IconButton):
     ''' Toggle version of IconButton. The callback command is given a boolean
         parameter which indicates whether the button is being turned on or off.
@@ -32,7 +32,7 @@ class CanvasEditLine():
                  drag_function=None, self_select_function=None, self_delete_function=None,
                  always_deselect:bool=False, menu_font_name='Segoe UI', menu_font_size=11,
                  double_click_to_delete:bool=True, deletable=True, active=True,
-                 tag_name:str='tag', state:str='normal'):
+                 tag_name:str='tag', state:str='normal', release_function=None):
         '''        
         Parameters
         ----------
@@ -52,6 +52,7 @@ class CanvasEditLine():
             :param draggable: bool - if True, line can be dragged in x dimension by cursor
             :param show_drag_color: bool - if True, show drag_color instead of select_color when line is being dragged
             :param drag_function: 2-float input function (current_x, cursor_position_x) - returns 1 float (new_x)
+            :param release_function: 1 argument function (x) or None - called when line is released after being clicked
             :param double_click_function: 1 argument function (event) or None - called when line is double clicked
             :param right_click_function: 1 argument function (event) or None - called when line is right clicked
             :param center_click_function: 1 argument function (event) or None - called when line is center clicked
@@ -72,7 +73,7 @@ class CanvasEditLine():
         else:
             self.colors = [[bg, select_color], [brighten(bg, brighten_fact), brighten(select_color, select_brighten_fact)]]
         self.selected, self.dragging, self.hovering = [False] * 3
-        self.drag_function = drag_function
+        self.drag_function, self.release_function = drag_function, release_function
         self.self_select_function, self.self_delete_function = self_select_function, self_delete_function
         self.always_deselect = always_deselect
         self.draggable, self.selectable, self.hoverable = draggable, selectable, hoverable        
@@ -165,6 +166,8 @@ class CanvasEditLine():
         '''cursor releases click'''
         if not self.active:
             return
+        if self.dragging and self.release_function:
+            self.release_function(self.get_x())
         self.dragging = False
         if not self.hovering:
             self.__hover_leave()
@@ -0,0 +1,113 @@
+import numpy as np
+
+# not exported by chichitk - used by PlotScrollBar to draw data series
+
+
+class SeriesDecimator:
+    ''' Min/max decimation of a large data series for drawing
+
+        Level k of the pyramid holds the minimum and maximum of each block of
+        2**k samples. Levels are built from the level below when they are first
+        needed and kept, so each zoom level is computed once. To draw a range
+        of samples in a number of pixel columns, the level whose blocks are
+        just smaller than a column is reduced column by column, which takes
+        time proportional to the number of columns rather than the number of
+        samples. Columns are aligned to the blocks of that level, except
+        that the first and last columns are reduced from the raw samples at
+        the ends of the range, so no column includes samples outside it.
+
+        NaN samples are ignored.
+    '''
+    def __init__(self, data):
+        '''
+        Parameters
+        ----------
+            :param data: 1d array-like of numbers - samples of the series
+        '''
+        data = np.asarray(data, dtype=float)
+        assert data.ndim == 1, f'SeriesDecimator data must be 1 dimensional, not {data.ndim}'
+        assert len(data) > 0, 'SeriesDecimator data is empty'
+        self.__levels = [(data, data)] # (mins, maxs) of each level - level 0 is the data
+        self.__min, self.__max = float(np.nanmin(data)), float(np.nanmax(data))
+        self.__last = None # (key, result) of the last call to columns
+
+    def __len__(self):
+        return len(self.__levels[0][0])
+
+    def get_range(self) -> tuple:
+        '''returns (min, max) of the whole series'''
+        return self.__min, self.__max
+
+    def __get_level(self, level:int):
+        '''returns (mins, maxs, block size) of level - builds missing levels'''
+        while len(self.__levels) <= level and len(self.__levels[-1][0]) > 1:
+            mins, maxs = self.__levels[-1]
+            n = len(mins) // 2 * 2
+            next_mins = np.fmin(mins[0:n:2], mins[1:n:2])
+            next_maxs = np.fmax(maxs[0:n:2], maxs[1:n:2])
+            if len(mins) % 2: # odd length - last block is a single block of the level below
+                next_mins = np.append(next_mins, mins[-1])
+                next_maxs = np.append(next_maxs, maxs[-1])
+            self.__levels.append((next_mins, next_maxs))
+        level = min(level, len(self.__levels) - 1)
+        return self.__levels[level][0], self.__levels[level][1], 2 ** level
+
+    def __reduce_range(self, lo:int, hi:int, level:int) -> tuple:
+        '''returns (min, max) of samples lo to hi (exclusive) - whole blocks of
+        level are used and the partial blocks at either end are read from the data'''
+        data = self.__levels[0][0]
+        mins, maxs, block = self.__get_level(level)
+        head_end = min(hi, -(-lo // block) * block) # first block boundary at or after lo
+        tail_start = max(head_end, hi // block * block)
+        parts_min = (data[lo:head_end], mins[head_end // block:tail_start // block], data[tail_start:hi])
+        parts_max = (data[lo:head_end], maxs[head_end // block:tail_start // block], data[tail_start:hi])
+        return np.fmin.reduce(np.concatenate(parts_min)), np.fmax.reduce(np.concatenate(parts_max))
+
+    def columns(self, start:float, end:float, width:int):
+        '''
+        Purpose
+        -------
+            computes the minimum and maximum of samples start to end divided
+            into width equal columns - columns outside the series are left out
+
+        Parameters
+        ----------
+            :param start: float - sample at left edge of first column (may be outside the series)
+            :param end: float - sample at right edge of last column
+            :param width: int - number of columns (pixels)
+
+        Returns
+        -------
+            :return: tuple(np.array, np.array, np.array) - (columns, mins, maxs)
+                     columns are indices (0 to width - 1) of the columns that
+                     contain samples
+        '''
+        key = (start, end, width)
+        if self.__last is not None and self.__last[0] == key:
+            return self.__last[1]
+        n = len(self)
+        empty = (np.array([], dtype=int), np.array([]), np.array([]))
+        if width < 1 or end <= start:
+            return empty
+        per_column = (end - start) / width
+        level = int(np.log2(per_column)) if per_column >= 1 else 0
+        mins, maxs, block = self.__get_level(level)
+        edges = start + np.arange(width + 1) * per_column
+        cols = np.nonzero((edges[:-1] < n) & (edges[1:] > 0))[0]
+        if len(cols) == 0:
+            return empty
+        starts = np.clip(np.floor(edges[cols]), 0, n - 1).astype(np.int64)
+        first = starts // block
+        end_sample = int(min(n, np.ceil(edges[cols[-1] + 1]))) # exclusive
+        end_block = -(-end_sample // block) # exclusive - rounded up
+        indices = first if end_block >= len(mins) else np.append(first, end_block)
+        col_mins = np.fmin.reduceat(mins, indices)[:len(cols)]
+        col_maxs = np.fmax.reduceat(maxs, indices)[:len(cols)]
+        # blocks of the first and last columns may reach past the ends of the range
+        first_end = max(first[1] * block, starts[0] + 1) if len(cols) > 1 else end_sample # columns before sample 0 may share it
+        col_mins[0], col_maxs[0] = self.__reduce_range(int(starts[0]), int(first_end), level)
+        if len(cols) > 1:
+            col_mins[-1], col_maxs[-1] = self.__reduce_range(int(first[-1] * block), end_sample, level)
+        result = (cols, col_mins, col_maxs)
+        self.__last = (key, result)
+        return result
@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+__all__ = ['FrameBuffer']
+
+
+class FrameBuffer:
+    ''' Prepares frames ahead of playback in a worker pool
+
+        The provider is a function (index) -> frame that may be slow, such as
+        decoding a frame of a video or computing a plot. Whenever frame i is
+        requested, frames i + 1 ... i + size - 1 are requested as well, so by
+        the time playback reaches a frame it is usually ready.
+
+        Frames are kept in a ring buffer of size slots - frame i goes in slot
+        i % size - so memory is bounded and frames that playback has passed are
+        replaced by frames ahead of it. Call invalidate() after a seek so that
+        frames around the old position are dropped.
+
+        The provider is called from worker threads, so it must be safe to call
+        from several threads at once, or workers must be 1. With a single
+        worker, frames are prepared in order, which suits sequential decoders.
+    '''
+    def __init__(self, provider, size:int=8, workers:int=2, frame_num:int=None):
+        '''
+        Parameters
+        ----------
+            :param provider: function (index) -> frame - called in worker threads
+            :param size: int - number of frames kept ready, including the current frame
+            :param workers: int - number of worker threads
+            :param frame_num: int or None - frames at or after frame_num are not prefetched
+        '''
+        assert size >= 1, f'FrameBuffer size must be at least 1, not {size}'
+        assert workers >= 1, f'FrameBuffer workers must be at least 1, not {workers}'
+        self.__provider = provider
+        self.__size, self.__workers = size, workers
+        self.__frame_num = frame_num
+        self.__slots = [None] * size # (index, future) - frame index is in slot index % size
+        self.__lock = Lock() # get may be called from the timer thread and the Tk thread
+        self.__executor = None # created on first request
+
+    def __get_executor(self):
+        '''returns worker pool - created when first needed'''
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=self.__workers)
+        return self.__executor
+
+    def __request(self, index:int):
+        '''returns future of frame index - submitted to the worker pool if it is
+        not in the buffer - replaces the frame that was in its slot'''
+        slot = index % self.__size
+        entry = self.__slots[slot]
+        if entry is not None:
+            if entry[0] == index:
+                return entry[1]
+            entry[1].cancel() # does nothing if the provider is already running
+        future = self.__get_executor().submit(self.__provider, index)
+        self.__slots[slot] = (index, future)
+        return future
+
+    def get(self, index:int, wait=False):
+        '''
+        Purpose
+        -------
+            returns frame index and requests the frames after it
+
+        Parameters
+        ----------
+            :param index: int - frame to return
+            :param wait: bool - if True, waits for the frame if it is not ready yet
+
+        Returns
+        -------
+            :return: frame returned by provider, or None if wait is False and
+                     the frame is not ready yet
+        '''
+        with self.__lock:
+            future = self.__request(index)
+            end = index + self.__size
+            if self.__frame_num is not None:
+                end = min(end, self.__frame_num)
+            for i in range(index + 1, end):
+                self.__request(i)
+        if wait or future.done():
+            return future.result() # raises if provider raised
+        return None
+
+    def is_ready(self, index:int) -> bool:
+        '''returns True if frame index is in the buffer and has been prepared'''
+        entry = self.__slots[index % self.__size]
+        return entry is not None and entry[0] == index and entry[1].done()
+
+    def invalidate(self):
+        '''drops every frame in the buffer - call after seeking'''
+        with self.__lock:
+            for entry in self.__slots:
+                if entry is not None:
+                    entry[1].cancel()
+            self.__slots = [None] * self.__size
+
+    def set_frame_num(self, frame_num:int):
+        '''updates number of frames - frames at or after frame_num are not prefetched'''
+        self.__frame_num = frame_num
+
+    def get_size(self) -> int:
+        '''returns number of slots in the ring buffer'''
+        return self.__size
+
+    def shutdown(self):
+        '''cancels frames that have not been started and stops worker pool'''
+        self.invalidate()
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
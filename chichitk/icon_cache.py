@@ -0,0 +1,233 @@
+from collections import OrderedDict
+import os
+
+from PIL import Image, ImageTk
+import numpy as np
+
+__all__ = ['IconCache']
+
+
+def hex_to_rgb(hex_code:str):
+    '''converts hex code to uint8 rgb'''
+    return tuple([int(h, 16) for h in (hex_code[1:3], hex_code[3:5], hex_code[5:])])
+
+def image_replace_colors(img:np.array, colors_list:list):
+    '''returns copy of img with pixels of each value color replaced by its
+    replace color - img is not changed, so read only icons can be recolored
+    only exact matches are replaced - use recolor_mask for icons
+        :param colors_list: list[tuple(str, str)] - (value, replace) hex codes'''
+    img = np.array(img) # copy - icons from chichitk.icons are read only
+    for value, replace in colors_list:
+        img[np.all(img == hex_to_rgb(value), axis=-1)] = hex_to_rgb(replace)
+    return img
+
+def read_icon(icon_path:str) -> np.ndarray:
+    '''returns image file as 3 channel uint8 rgb array - transparency is ignored'''
+    with Image.open(icon_path) as image:
+        return np.array(image.convert('RGB'))
+
+def resample_weights(src:int, dst:int) -> np.ndarray:
+    '''returns (dst, src) matrix that resamples src pixels to dst pixels along
+    one axis - each pixel is the average of the source pixels it covers,
+    weighted by the fraction covered (area averaging, like cv2.INTER_AREA)'''
+    scale = src / dst # source pixels covered by each pixel
+    lows = np.arange(dst)[:, None] * scale
+    pixels = np.arange(src)[None, :]
+    overlap = np.minimum(lows + scale, pixels + 1) - np.maximum(lows, pixels)
+    return np.clip(overlap, 0, None) / scale
+
+def resize_area(mask:np.ndarray, size:tuple) -> np.ndarray:
+    '''returns 2d uint8 mask resized to size (width, height) with area averaging
+    - thin lines of shrunk icons stay visible as lighter pixels'''
+    height, width = mask.shape
+    resized = resample_weights(height, size[1]) @ mask.astype(float) @ resample_weights(width, size[0]).T
+    return np.clip(np.rint(resized), 0, 255).astype(np.uint8)
+
+def icon_mask(img:np.array) -> np.array:
+    '''returns single channel uint8 intensity of black and white icon
+    0 is background and 255 is foreground - values in between are anti-aliased edges
+        :param img: np.array - 2d or 3d (any number of channels) icon'''
+    img = np.asarray(img)
+    if img.ndim == 3: # channels of a black and white image are equal - max keeps colored pixels visible
+        img = img.max(axis=-1)
+    return img.astype(np.uint8)
+
+def color_luts(colors:list) -> np.array:
+    '''returns lookup tables of shape (len(colors), 256, 3) - table i maps
+    intensity 0 to 255 linearly from bg to fg of colors[i]
+        :param colors: list[tuple(str, str)] - (fg, bg) hex codes'''
+    fgs = np.array([hex_to_rgb(fg) for fg, _ in colors], dtype=float)[:, None, :]
+    bgs = np.array([hex_to_rgb(bg) for _, bg in colors], dtype=float)[:, None, :]
+    weights = np.linspace(0, 1, 256)[None, :, None]
+    return np.rint(bgs + (fgs - bgs) * weights).astype(np.uint8)
+
+def recolor_mask(mask:np.array, fg:str, bg:str) -> np.array:
+    '''returns rgb image of shape mask.shape + (3,) with intensity mask
+    blended from bg (0) to fg (255)'''
+    return color_luts([(fg, bg)])[0][mask]
+
+def recolor_mask_batch(mask:np.array, colors:list) -> np.array:
+    '''returns rgb images of shape (len(colors),) + mask.shape + (3,) - one
+    for each (fg, bg) pair in colors, computed in a single lookup'''
+    return color_luts(colors)[:, mask]
+
+
+class IconCache:
+    ''' Process-wide cache of recolored icon images
+
+        Icons are black and white images that are recolored for each widget -
+        white is replaced by the foreground color and black by the background
+        color. Widgets that show the same icon in the same colors and size
+        share a single PhotoImage, so an icon is only recolored once no matter
+        how many buttons use it.
+
+        Each image is reference counted - acquire() increments the count and
+        release() decrements it. Images that are no longer used are kept in a
+        small least recently used list (max_unused) so that widgets that are
+        destroyed and recreated do not recolor again, and are freed after that.
+
+        Icons are identified by the numpy array object, so icon arrays must
+        not be modified after they are first used. Icons loaded from files
+        with load() are kept so that every widget gets the same array.
+
+        Each icon is converted once to a single channel intensity mask (see
+        icon_mask), which is resized to each requested size. Colors are then
+        applied with a lookup table that blends from bg to fg, so anti-aliased
+        edges stay smooth at any size. Several colors of the same icon are
+        computed in one pass with acquire_many().
+
+        Use IconCache.get() to get the process-wide instance.
+    '''
+    __instance = None
+
+    def __init__(self, max_unused:int=64):
+        '''
+        Parameters
+        ----------
+            :param max_unused: int - number of images kept after their last widget released them
+        '''
+        self.__max_unused = max_unused
+        self.__entries = {} # key -> [PhotoImage, reference count, icon array]
+        self.__unused = OrderedDict() # keys with reference count 0 - least recently used first
+        self.__keys = {} # id(PhotoImage) -> key
+        self.__files = {} # (path, mtime) -> icon array
+        self.__masks = {} # (id(icon), size) -> (icon, intensity mask)
+        self.__recolor_count = 0
+
+    @classmethod
+    def get(cls):
+        '''returns the process-wide icon cache - created when first needed'''
+        if cls.__instance is None:
+            cls.__instance = cls()
+        return cls.__instance
+
+    def load(self, icon_path:str) -> np.ndarray:
+        '''returns icon from .png file as 3 channel array - each file is read once'''
+        assert len(icon_path) > 4, f'IconCache Error: Invalid path: {icon_path}'
+        assert icon_path[-4:] == '.png', f'IconCache Error: icon_path is not a .png file: {icon_path}'
+        assert os.path.exists(icon_path), f'IconCache Error: Path to .png file does not exist: {icon_path}'
+        key = (os.path.abspath(icon_path), os.path.getmtime(icon_path))
+        if key not in self.__files:
+            self.__files[key] = read_icon(icon_path)
+        return self.__files[key]
+
+    def acquire(self, icon:np.ndarray, fg:str, bg:str, master, size:tuple=None) -> ImageTk.PhotoImage:
+        '''
+        Purpose
+        -------
+            returns PhotoImage of icon recolored to fg and bg - recolored only
+            if no widget has the same icon in the same colors and size
+            call release() with the image when it is no longer used
+
+        Parameters
+        ----------
+            :param icon: np.array - black and white rgb icon
+            :param fg: str (hex code) - color that replaces white
+            :param bg: str (hex code) - color that replaces black
+            :param master: tk widget - image belongs to the Tk instance of master
+            :param size: tuple(int, int) or None - (width, height) of image - default is icon size
+        '''
+        return self.acquire_many(icon, [(fg, bg)], master, size=size)[0]
+
+    def acquire_many(self, icon:np.ndarray, colors:list, master, size:tuple=None) -> list:
+        '''
+        Purpose
+        -------
+            same as acquire() for several colors of the same icon - colors
+            that are not in the cache are recolored together in one pass
+            call release() with each image when it is no longer used
+
+        Parameters
+        ----------
+            :param icon: np.array - black and white icon
+            :param colors: list[tuple(str, str)] - (fg, bg) hex codes
+            :param master: tk widget - images belong to the Tk instance of master
+            :param size: tuple(int, int) or None - (width, height) of images - default is icon size
+
+        Returns
+        -------
+            :return: list[ImageTk.PhotoImage] - one image for each (fg, bg) in colors
+        '''
+        keys = [(id(icon), fg.lower(), bg.lower(), size, master.tk) for fg, bg in colors]
+        missing = list(dict.fromkeys(key for key in keys if key not in self.__entries)) # unique - in order
+        if missing:
+            images = recolor_mask_batch(self.__get_mask(icon, size), [(key[1], key[2]) for key in missing])
+            self.__recolor_count += len(missing)
+            for key, image in zip(missing, images):
+                entry = [ImageTk.PhotoImage(image=Image.fromarray(image), master=master), 0, icon]
+                self.__entries[key] = entry
+                self.__keys[id(entry[0])] = key
+                self.__unused[key] = None # removed below when it is acquired
+        photos = []
+        for key in keys:
+            entry = self.__entries[key]
+            if entry[1] == 0: # in use again
+                del self.__unused[key]
+            entry[1] += 1
+            photos.append(entry[0])
+        return photos
+
+    def __get_mask(self, icon:np.ndarray, size:tuple) -> np.ndarray:
+        '''returns intensity mask of icon resized to size - computed once for each size'''
+        key = (id(icon), size)
+        if key not in self.__masks:
+            mask = icon_mask(icon)
+            if size is not None and size != (mask.shape[1], mask.shape[0]):
+                mask = resize_area(mask, size)
+            self.__masks[key] = (icon, mask) # icon is kept so that its id is not reused
+        return self.__masks[key][1]
+
+    def release(self, image:ImageTk.PhotoImage):
+        '''decrements the reference count of image - does nothing for images
+        that did not come from acquire()'''
+        key = self.__keys.get(id(image))
+        if key is None:
+            return
+        entry = self.__entries[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            self.__unused[key] = None
+            while len(self.__unused) > self.__max_unused:
+                old_key, _ = self.__unused.popitem(last=False)
+                self.__evict(old_key)
+
+    def __evict(self, key):
+        '''frees image of key - masks of its icon are freed with the last image of the icon'''
+        del self.__keys[id(self.__entries.pop(key)[0])]
+        if not any(other[0] == key[0] for other in self.__entries):
+            for mask_key in [mask_key for mask_key in self.__masks if mask_key[0] == key[0]]:
+                del self.__masks[mask_key]
+
+    def get_recolor_count(self) -> int:
+        '''returns number of images that have been recolored'''
+        return self.__recolor_count
+
+    def get_size(self) -> int:
+        '''returns number of images in the cache, including unused images'''
+        return len(self.__entries)
+
+    def clear_unused(self):
+        '''frees images that are not used by any widget'''
+        for key in list(self.__unused):
+            self.__evict(key)
+        self.__unused.clear()
@@ -1,11 +1,9 @@
 from tkinter import Frame, Label
 
-from PIL import Image, ImageTk
 import numpy as np
-import cv2, os
 
 from .icons import icons
-from .buttons import image_replace_colors
+from .icon_cache import IconCache
 
 __all__ = ['Icon', 'CheckIcon', 'CheckLabel', 'IconCheckLabel']
 
@@ -36,10 +34,8 @@ class Icon(Label):
         fg2 = fg2 if fg2 is not None else fg
 
         img_ar = self.__get_img_array(icon_path)
-        self.img0 = cv2.resize(image_replace_colors(img_ar, [('#ffffff', fg), ('#000000', bg)]), (w, h))
-        self.img1 = cv2.resize(image_replace_colors(img_ar, [('#ffffff', fg2), ('#000000', bg2)]), (w, h))
-
-        # TODO: can't get img1 colors to show up when calling set()
+        cache = IconCache.get() # images are shared with other icons of the same colors and size
+        self.images = cache.acquire_many(img_ar, [(fg, bg), (fg2, bg2)], self, size=(w, h))
 
         self.set(status)
 
@@ -48,10 +44,7 @@ class Icon(Label):
         :icon_path: str (filepath) or np.array
         '''
         if isinstance(icon_path, str): # path to image
-            assert len(icon_path) > 4, f'Icon Error: Invalid path: {icon_path}'
-            assert icon_path[-4:] == '.png', f'Icon Error: icon_path is not a .png file: {icon_path}'
-            assert os.path.exists(icon_path), f'Icon Error: Path to .png file does not exist: {icon_path}'
-            return cv2.imread(icon_path)
+            return IconCache.get().load(icon_path)
         elif isinstance(icon_path, np.ndarray): # 3d numpy array
             return icon_path
         else:
@@ -59,12 +52,15 @@ class Icon(Label):
         
     def set(self, status:bool):
         '''sets background color'''
-        if status: # bg2
-            image = ImageTk.PhotoImage(image=Image.fromarray(self.img1), master=self)
-        else:
-            image = ImageTk.PhotoImage(image=Image.fromarray(self.img0), master=self)
-        self.config(image=image)
-        self.image = image
+        self.image = self.images[bool(status)] # bg2 if status
+        self.config(image=self.image)
+
+    def destroy(self):
+        '''releases shared images before destroying widget'''
+        for image in self.images:
+            IconCache.get().release(image)
+        self.images = []
+        super().destroy()
 
 class ToggleIcon(Frame):
     ''' Displays one of two icons depending on status
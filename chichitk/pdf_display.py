@@ -1,10 +1,15 @@
-from tkinter import Toplevel, Frame, Label, Text, Scrollbar, PhotoImage, filedialog
-from threading import Thread
+from tkinter import Toplevel, Frame, Label, Canvas, Scrollbar, PhotoImage, filedialog
+from tkinter import font as tkfont
+from PIL import ImageTk
+from bisect import bisect_right
 import shutil # for copying files
-import fitz # fitz is PyMuPDF
+import os
 
 from .buttons import IconButton
 from .icons import icons
+from .pdf_render import (PageRenderer, PageCache, DiskPageCache, ThumbnailStore, file_hash,
+                         page_size, resize_ppm, thumbnail_job, mupdf_executor, page_rects_job)
+from .pdf_search import index_job, get_cached_index, set_cached_index
 
 
 class PdfDisplay(Frame):
@@ -15,7 +20,14 @@ class PdfDisplay(Frame):
     def __init__(self, master, bg, fg, font_name:str='Segoe UI', font_size:int=20,
                  button_pad:int=2, view_width=75, zoom_fact=1, height:int=600,
                  buttons_side='left', buttons_bg='#ffffff',
-                 new_window_option=True, download_option=True, zoom_options=True):
+                 new_window_option=True, download_option=True, zoom_options=True,
+                 lazy:bool=True, look_ahead:int=2, keep_pages:int=6,
+                 render_workers:int=2, render_processes:bool=False,
+                 cache_bytes:int=2**28, cache_dir:str=None, cache_dir_bytes:int=2**30,
+                 page_gap:int=12, scroll_px:int=70, thumbnails:bool=False,
+                 thumbnail_dpi:int=10, thumbnail_chunk:int=16, searchable:bool=False,
+                 search_callback=None, search_color:str='#ffb000',
+                 search_current_color:str='#ff3c00'):
         '''
         
         Parameters
@@ -33,11 +45,34 @@ class PdfDisplay(Frame):
             :param new_window_option: bool - if True, include button to open in new window
             :param download_option: bool - if True, include button to download pdf
             :param zoom_options: bool - if True, include buttons to zoom pdf
+            :param lazy: bool - if True, only pages in view are rendered, other pages are blank placeholders
+            :param look_ahead: int - number of pages above and below the view to render ahead of time (lazy only)
+            :param keep_pages: int - rendered pages further than this from the view are freed (lazy only)
+            :param render_workers: int - number of worker processes rasterising pages (processes only)
+            :param render_processes: bool - if False, all MuPDF work runs on a single background thread,
+                                            which can briefly stall the view while large pages render
+                                          - if True, rasterise in worker processes so that the view stays
+                                            responsive - worker processes import the main module, so on
+                                            Windows and macOS the application must create its widgets
+                                            under `if __name__ == '__main__':` (see PageRenderer)
+            :param cache_bytes: int - memory budget for rendered pages kept for zooming and reopening
+            :param cache_dir: str or None - optional directory where rendered pages are kept between sessions
+            :param cache_dir_bytes: int - size cap of cache_dir - least recently used pages are deleted
+            :param page_gap: int - pixels between pages
+            :param scroll_px: int - pixels scrolled per mouse wheel step
+            :param thumbnails: bool - if True, include sidebar with page thumbnails to jump between pages
+            :param thumbnail_dpi: int - resolution of thumbnails
+            :param thumbnail_chunk: int - number of thumbnails rendered by each background job
+            :param searchable: bool - if True, text of each pdf is indexed in the background as soon as it is shown
+                                    - otherwise it is indexed when search() is first called
+            :param search_callback: function (results) - called with the results of each search()
+            :param search_color: str (hex code) - outline of search results
+            :param search_current_color: str (hex code) - outline of the selected search result
         '''
         assert buttons_side in ['left', 'right'], f"Invalid buttons side: '{buttons_side}', must be 'left' or 'right'"
         Frame.__init__(self, master, bg=bg)
         self.button_pad = button_pad
-        self.bg = bg # store for new window
+        self.bg, self.fg = bg, fg # store for new window
         self.width, self.height = view_width, height
         self.zoom_fact = zoom_fact # never changes
         self.scale_fact = 1 # changes when zooming in and out
@@ -45,6 +80,35 @@ class PdfDisplay(Frame):
         self.buttons_side = buttons_side
         self.pdf_frame = None # tk.Frame once a pdf is loaded
         self.active = False # True when a pdf is loaded
+        self.lazy = lazy
+        self.look_ahead, self.keep_pages = look_ahead, max(keep_pages, look_ahead)
+        self.page_gap, self.scroll_px = page_gap, scroll_px
+        self.page_rects = [] # fitz.Rect of each page - read once when pdf is loaded
+        self.page_sizes = [] # (width, height) of each page in pixels at the current dpi
+        self.page_offsets = [] # y coordinate of the top of each page at the current dpi
+        self.page_items = {} # page index -> canvas image item for pages that have an image
+        self.visible_pending = False # True when a visibility update is scheduled
+        self.renderer = PageRenderer(self, self.__page_rendered, workers=render_workers,
+                                     processes=render_processes)
+        self.cache = PageCache(max_bytes=cache_bytes) # kept when pdf is removed or zoomed
+        self.mtime = None # modification time of self.filename when it was loaded
+        self.cache_dir, self.cache_dir_bytes = cache_dir, cache_dir_bytes # passed to new windows
+        self.disk_cache = DiskPageCache(cache_dir, cache_dir_bytes) if cache_dir is not None else None
+        self.file_hash = None # content hash of self.filename - only computed if disk_cache is used
+        self.thumbnails = thumbnails
+        self.thumbnail_dpi, self.thumbnail_chunk = thumbnail_dpi, thumbnail_chunk
+        self.thumbnail_bar = None # PdfThumbnails once a pdf is loaded (if thumbnails is True)
+        # separate from self.renderer so that zooming does not cancel thumbnails
+        self.thumbnail_renderer = PageRenderer(self, self.__thumbnails_rendered,
+                                               workers=render_workers, processes=render_processes)
+        self.searchable, self.search_callback = searchable, search_callback
+        self.search_color, self.search_current_color = search_color, search_current_color
+        self.search_index = None # SearchIndex of current pdf once it has been built
+        self.index_renderer = PageRenderer(self, self.__index_built, workers=1,
+                                           processes=render_processes)
+        self.search_query = None # most recent query - run again once index is built
+        self.search_results = [] # (page, rects) of each result of the most recent search - SearchResults once searched
+        self.search_position = None # index of selected result in self.search_results
 
         # Buttons Frame
         self.buttons_frame = Frame(self, bg='#ffffff')
@@ -98,55 +162,324 @@ class PdfDisplay(Frame):
     def remove_all(self):
         '''removes pdf, buttons, and label'''
         self.active = False
+        self.renderer.cancel() # abort renders of the previous document or zoom
+        self.thumbnail_renderer.cancel()
+        self.index_renderer.cancel()
+        self.search_index, self.search_query = None, None
+        self.search_results, self.search_position = [], None
         self.label.pack_forget()
         self.buttons_frame.place_forget()
         if self.pdf_frame != None:
             self.pdf_frame.destroy()
+            self.pdf_frame = None
+        if self.thumbnail_bar is not None:
+            self.thumbnail_bar.destroy()
+            self.thumbnail_bar = None
+        self.img_object_list = []
+        self.page_items = {}
 
     def show_pdf(self, filename:str):
         '''loads pdf from the given filepath'''
         self.scale_fact = 1 # reset zoom
         self.filename = filename
+        self.mtime = os.path.getmtime(filename)
+        if self.disk_cache is not None:
+            self.file_hash = file_hash(filename)
         self.remove_all()
         self.active = True
-        Thread(target=self.render_pdf()).start()
+        self.render_pdf()
+        if self.searchable:
+            self.build_search_index()
+
+    def get_dpi(self) -> int:
+        '''returns dpi at which pages are rendered based on zoom'''
+        return int(72 * self.zoom_fact * self.scale_fact)
 
     def render_pdf(self):
-        '''loads pdf from self.filename - MUST be called in Thread'''
-        # Create image objects from pdf pages
-        self.img_object_list = []
-        for page in fitz.open(self.filename):
-            pix = page.get_pixmap(dpi=int(72 * self.zoom_fact * self.scale_fact))
-            pix1 = fitz.Pixmap(pix, 0) if pix.alpha else pix
-            image = pix1.tobytes("ppm")
-            self.img_object_list.append(PhotoImage(data=image))
+        '''lays out pdf from self.filename with placeholder pages
+        pages are rasterised in the background and drawn as they finish'''
+        # read on the MuPDF thread - MuPDF is not thread safe
+        self.page_rects = mupdf_executor().submit(page_rects_job, self.filename).result()
+        self.page_offsets = [] # set by layout_pages
+        self.img_object_list = [None] * len(self.page_rects)
+
+        if self.thumbnails: # sidebar left of pdf - filled by background jobs of thumbnail_chunk pages
+            sizes = [page_size(rect, self.thumbnail_dpi) for rect in self.page_rects]
+            self.thumbnail_bar = PdfThumbnails(self, self.go_to_page, sizes, bg=self.bg, fg=self.fg)
+            self.thumbnail_bar.pack(side='left', fill='y')
+            for first in range(0, len(sizes), self.thumbnail_chunk):
+                last = min(len(sizes), first + self.thumbnail_chunk)
+                self.thumbnail_renderer.submit(first, thumbnail_job, self.filename, first, last,
+                                               self.thumbnail_dpi)
 
         # Create new pdf frame
-        width = int(self.width * self.scale_fact)
-        height = int(self.height * self.scale_fact)
-        self.pdf_frame = Frame(self, height=height, width=width, bg=self.bg)
+        self.pdf_frame = Frame(self, bg=self.bg)
         self.scroll_y = Scrollbar(self.pdf_frame, orient="vertical")
         self.scroll_x = Scrollbar(self.pdf_frame, orient="horizontal")
         self.scroll_x.pack(side='bottom', fill='x')
         self.scroll_y.pack(side='right', fill='y')
-        # Font size is used to control the space between pages
-        self.pdf_text = Text(self.pdf_frame, bg=self.bg, yscrollcommand=self.scroll_y.set,
-                             xscrollcommand=self.scroll_x.set, #font=('Segoe UI', 2),
-                             height=height, width=width)
-        self.pdf_text.pack(side="left")
-        self.scroll_x.config(command=self.pdf_text.xview)
-        self.scroll_y.config(command=self.pdf_text.yview)
+        self.pdf_canvas = Canvas(self.pdf_frame, bg=self.bg, highlightthickness=0,
+                                 yscrollcommand=self.__yscroll, xscrollcommand=self.scroll_x.set,
+                                 xscrollincrement=1, yscrollincrement=1) # scroll by pixel
+        self.pdf_canvas.config(**self.get_view_size())
+        self.pdf_canvas.pack(side="left")
+        self.scroll_x.config(command=self.pdf_canvas.xview)
+        self.scroll_y.config(command=self.pdf_canvas.yview)
+        self.pdf_canvas.bind('<MouseWheel>', self.__mouse_wheel)
         self.pdf_frame.pack()
         self.pdf_frame.bind('<Configure>', self.position_buttons)
         self.update() # render so that buttons are positioned properly
         self.position_buttons() # place buttons and raise above pdf
 
-        # Add pages to text box
-        for i, img in enumerate(self.img_object_list):
-            if i > 0: # add space before next page
-                self.pdf_text.insert('end', '\n\n')
-            self.pdf_text.image_create('end', image=img)
-        self.pdf_text.configure(state='disabled')
+        self.layout_pages()
+        if not self.lazy: # render every page
+            for i in range(len(self.img_object_list)):
+                self.load_page(i, self.get_dpi())
+        self.update_visible_pages()
+
+    def get_view_size(self) -> dict:
+        '''returns canvas width and height in pixels at the current zoom
+        view_width and height were originally given in Text widget units, so
+        they are converted using the default Text font to keep the same size'''
+        font = tkfont.nametofont('TkFixedFont')
+        return {'width':int(self.width * self.scale_fact * font.measure('0')),
+                'height':int(self.height * self.scale_fact * font.metrics('linespace'))}
+
+    def layout_pages(self):
+        '''computes page positions at the current dpi and draws a blank
+        placeholder for every page - removes all page images'''
+        dpi = self.get_dpi()
+        self.page_sizes = [page_size(rect, dpi) for rect in self.page_rects]
+        self.page_offsets, y = [], 0
+        for _, h in self.page_sizes:
+            self.page_offsets.append(y)
+            y += h + self.page_gap
+        self.content_width = max([w for w, _ in self.page_sizes], default=0)
+        self.content_height = max(0, y - self.page_gap)
+
+        self.pdf_canvas.delete('all')
+        self.page_items = {}
+        self.img_object_list = [None] * len(self.page_rects)
+        for i, (w, h) in enumerate(self.page_sizes):
+            x, y = self.get_page_x(i), self.page_offsets[i]
+            self.pdf_canvas.create_rectangle(x, y, x + w, y + h, fill='#ffffff', width=0)
+        self.pdf_canvas.config(scrollregion=(0, 0, self.content_width, self.content_height))
+
+    def get_page_x(self, page_index:int) -> int:
+        '''returns x coordinate of left edge of page - pages are centered'''
+        return (self.content_width - self.page_sizes[page_index][0]) // 2
+
+    def get_visible_pages(self):
+        '''returns (first, last) index of pages that intersect the view'''
+        top = self.pdf_canvas.canvasy(0)
+        bottom = self.pdf_canvas.canvasy(self.pdf_canvas.winfo_height())
+        first = max(0, bisect_right(self.page_offsets, top) - 1)
+        last = max(0, bisect_right(self.page_offsets, bottom) - 1)
+        return first, last
+
+    def get_page(self) -> int:
+        '''returns index of the page at the top of the view'''
+        return self.get_visible_pages()[0] if self.page_offsets else 0
+
+    def go_to_page(self, page_index:int, offset:float=0):
+        '''scrolls so that the top of the page is at the top of the view
+
+        Parameters
+        ----------
+            :param page_index: int - page number starting from 0
+            :param offset: float between 0 and 1 - fraction of the page scrolled past
+        '''
+        if self.content_height > 0:
+            y = self.page_offsets[page_index] + offset * self.page_sizes[page_index][1]
+            self.pdf_canvas.yview_moveto(y / self.content_height)
+
+    def update_visible_pages(self):
+        '''requests pages in view (plus look ahead) and frees pages far out of view
+        in lazy mode - redraws search results near the view'''
+        self.visible_pending = False
+        if self.pdf_frame is None or not self.page_offsets:
+            return
+        first, last = self.get_visible_pages()
+        if self.thumbnail_bar is not None:
+            self.thumbnail_bar.set_page(first)
+        if self.lazy:
+            for i in list(self.page_items):
+                if i < first - self.keep_pages or i > last + self.keep_pages:
+                    self.pdf_canvas.delete(self.page_items.pop(i)) # placeholder is underneath
+                    self.img_object_list[i] = None
+            for key in self.renderer.get_pending(): # pages passed while scrolling - pages in view go first
+                if key[0] < first - self.look_ahead or key[0] > last + self.look_ahead:
+                    self.renderer.cancel_request(key)
+            dpi = self.get_dpi()
+            for i in range(max(0, first - self.look_ahead),
+                           min(len(self.img_object_list), last + self.look_ahead + 1)):
+                if self.img_object_list[i] is None:
+                    self.load_page(i, dpi)
+        self.draw_search_results(first - self.look_ahead, last + self.look_ahead)
+
+    def load_page(self, page_index:int, dpi:int):
+        '''shows page from cache if it has been rendered at dpi before, otherwise
+        shows a scaled preview of the closest cached resolution (if any) and
+        requests the page to be rendered at dpi'''
+        data = self.cache.get(self.filename, self.mtime, page_index, dpi)
+        if data is None and self.disk_cache is not None:
+            data = self.disk_cache.get(self.file_hash, page_index, dpi)
+            if data is not None: # keep in memory for zooming
+                self.cache.put(self.filename, self.mtime, page_index, dpi, data)
+        if data is not None:
+            self.set_page_image(page_index, PhotoImage(data=data))
+            return
+        nearest = self.cache.nearest(self.filename, self.mtime, page_index, dpi)
+        if nearest is not None:
+            size = self.page_sizes[page_index]
+            self.set_page_image(page_index, ImageTk.PhotoImage(resize_ppm(nearest[1], *size), master=self))
+        cache_path = None # written by the render worker so that the Tk thread does not wait for the disk
+        if self.disk_cache is not None:
+            cache_path = self.disk_cache.page_path(self.file_hash, page_index, dpi)
+        self.renderer.request((page_index, dpi), self.filename, page_index, dpi, cache_path)
+
+    def set_page_image(self, page_index:int, img):
+        '''replaces image of page - img is PhotoImage or ImageTk.PhotoImage'''
+        self.img_object_list[page_index] = img
+        if page_index in self.page_items:
+            self.pdf_canvas.itemconfig(self.page_items[page_index], image=img)
+        else:
+            self.page_items[page_index] = self.pdf_canvas.create_image(
+                self.get_page_x(page_index), self.page_offsets[page_index], image=img, anchor='nw')
+            self.pdf_canvas.tag_raise('search') # keep search results above pages
+
+    def __page_rendered(self, key:tuple, data:bytes):
+        '''called by renderer on the Tk thread when a page has been rasterised'''
+        page_index, dpi = key
+        self.cache.put(self.filename, self.mtime, page_index, dpi, data)
+        if self.disk_cache is not None: # written by the render worker
+            path = self.disk_cache.page_path(self.file_hash, page_index, dpi)
+            if path is not None:
+                self.disk_cache.record(path)
+        if self.pdf_frame is None or dpi != self.get_dpi():
+            return
+        if self.lazy:
+            first, last = self.get_visible_pages()
+            if page_index < first - self.keep_pages or page_index > last + self.keep_pages:
+                return # scrolled away while rendering - only kept in cache
+        self.set_page_image(page_index, PhotoImage(data=data))
+
+    def build_search_index(self):
+        '''starts extracting the text of the current pdf in the background
+        does nothing if the index has been built or is being built'''
+        if not self.active or self.search_index is not None or self.index_renderer.is_pending('index'):
+            return
+        cached = get_cached_index(self.filename, self.mtime)
+        if cached is not None:
+            self.search_index = cached
+            return
+        cache_path = None # index is saved with rendered pages if disk cache is used
+        if self.disk_cache is not None:
+            cache_path = self.disk_cache.index_path(self.file_hash)
+        self.index_renderer.submit('index', index_job, self.filename, cache_path)
+
+    def search(self, query:str):
+        '''
+        Purpose
+        -------
+            finds query in the current pdf, outlines every result, and scrolls
+            to the first one. Words must appear in order - case and
+            punctuation are ignored.
+            if the text has not been indexed yet, indexing is started and the
+            search is run once it is finished
+
+        Returns
+        -------
+            :return: SearchResults or None - sequence of (page, rects) of
+                     each result, rects in pdf points - None if index is not built yet
+        '''
+        self.search_query = query
+        if self.search_index is None:
+            self.build_search_index()
+            if self.search_index is None: # searched again by __index_built
+                return None
+        self.search_results = self.search_index.search(query) # rects are looked up when results are drawn
+        if self.search_results:
+            self.show_search_result(0)
+        else:
+            self.search_position = None
+            self.pdf_canvas.delete('search')
+        if self.search_callback is not None:
+            self.search_callback(self.search_results)
+        return self.search_results
+
+    def show_search_result(self, n:int):
+        '''selects result n of the most recent search and scrolls to it'''
+        if not self.search_results:
+            return
+        self.search_position = n % len(self.search_results)
+        page, rects = self.search_results[self.search_position]
+        y = min(r[1] for r in rects) / self.page_rects[page].height
+        self.go_to_page(page, max(0, y - 0.05)) # leave a little space above result
+        first, last = self.get_visible_pages()
+        self.draw_search_results(first - self.look_ahead, last + self.look_ahead)
+
+    def next_result(self):
+        '''selects the next result of the most recent search - wraps to the first result'''
+        if self.search_position is not None:
+            self.show_search_result(self.search_position + 1)
+
+    def previous_result(self):
+        '''selects the previous result of the most recent search - wraps to the last result'''
+        if self.search_position is not None:
+            self.show_search_result(self.search_position - 1)
+
+    def clear_search(self):
+        '''removes outlines of search results'''
+        self.search_query = None
+        self.search_results, self.search_position = [], None
+        if self.pdf_frame is not None:
+            self.pdf_canvas.delete('search')
+
+    def get_search_results(self) -> list:
+        '''returns (page, rects) of each result of the most recent search'''
+        return self.search_results
+
+    def draw_search_results(self, first:int, last:int):
+        '''outlines search results on pages first to last'''
+        self.pdf_canvas.delete('search')
+        if not self.search_results:
+            return
+        scale = self.get_dpi() / 72
+        for page in range(max(0, first), min(len(self.page_rects), last + 1)):
+            x, y = self.get_page_x(page), self.page_offsets[page]
+            for n, rects in self.search_results.get_page(page):
+                current = n == self.search_position
+                for x0, y0, x1, y1 in rects:
+                    self.pdf_canvas.create_rectangle(x + x0 * scale, y + y0 * scale, x + x1 * scale,
+                                                     y + y1 * scale, width=2 + current, tags='search',
+                                                     outline=self.search_current_color if current else self.search_color)
+
+    def __index_built(self, key:str, index):
+        '''called by index renderer on the Tk thread once the text has been indexed'''
+        set_cached_index(self.filename, self.mtime, index)
+        if self.disk_cache is not None: # counted against cache_dir_bytes
+            self.disk_cache.record(self.disk_cache.index_path(self.file_hash))
+        self.search_index = index
+        if self.search_query is not None: # search was requested before index was ready
+            self.search(self.search_query)
+
+    def __thumbnails_rendered(self, first:int, thumbnails:list):
+        '''called by thumbnail renderer on the Tk thread when a chunk of thumbnails has been rendered'''
+        if self.thumbnail_bar is not None:
+            self.thumbnail_bar.add_thumbnails(first, thumbnails)
+
+    def __yscroll(self, first, last):
+        '''called by canvas whenever the view changes - updates scrollbar
+        and schedules visible pages to be rendered once the view settles'''
+        self.scroll_y.set(first, last)
+        if not self.visible_pending:
+            self.visible_pending = True
+            self.after_idle(self.update_visible_pages)
+
+    def __mouse_wheel(self, event):
+        '''event.delta / 120 is number of scroll steps - positive for up'''
+        self.pdf_canvas.yview_scroll(int(-event.delta / 120 * self.scroll_px), 'units')
 
     def remove_pdf(self):
         '''removes pdf and goes back to 'No File Loaded' label'''
@@ -154,19 +487,33 @@ class PdfDisplay(Frame):
         self.label.config(text='No File Loaded')
         self.label.pack(fill='both', expand=True)
 
+    def set_zoom(self, scale_fact:float):
+        '''updates zoom in place - widgets and the page in view are kept, only
+        page images are replaced (scaled from cache until the sharp render arrives)'''
+        self.scale_fact = scale_fact
+        if self.pdf_frame is None: # no pdf loaded - zoom applies to next pdf
+            return
+        self.renderer.cancel() # renders at the previous scale are no longer needed
+
+        # remember page in view and how far it is scrolled
+        page = self.get_page()
+        offset = (self.pdf_canvas.canvasy(0) - self.page_offsets[page]) / self.page_sizes[page][1]
+
+        self.pdf_canvas.config(**self.get_view_size())
+        self.layout_pages()
+        self.go_to_page(page, offset) # same point on the same page
+        if not self.lazy:
+            for i in range(len(self.img_object_list)):
+                self.load_page(i, self.get_dpi())
+        self.update_visible_pages()
+
     def zoom_in(self):
         '''update zoom_fact and re-render pdf'''
-        self.scale_fact *= 1.1
-        self.remove_all()
-        self.active = True
-        Thread(target=self.render_pdf()).start()
+        self.set_zoom(self.scale_fact * 1.1)
 
     def zoom_out(self):
         '''update zoom_fact and re-render pdf'''
-        self.scale_fact /= 1.1
-        self.remove_all()
-        self.active = True
-        Thread(target=self.render_pdf()).start()
+        self.set_zoom(self.scale_fact / 1.1)
 
     def to_loading(self, text='Loading...'):
         '''removes current pdf and displays loading text'''
@@ -185,9 +532,141 @@ class PdfDisplay(Frame):
             destination += '.pdf'
         shutil.copy2(self.filename, destination)
 
+    def destroy(self):
+        '''stops render workers before destroying widget'''
+        self.remove_all()
+        self.renderer.shutdown()
+        self.thumbnail_renderer.shutdown()
+        self.index_renderer.shutdown()
+        super().destroy()
+
     def open_in_window(self):
         '''opens PDF in new window - can only ever be called when a PDF is being viewed'''
-        PdfWindow(self.filename, self.bg)
+        PdfWindow(self.filename, self.bg, cache_dir=self.cache_dir,
+                  cache_dir_bytes=self.cache_dir_bytes, thumbnails=self.thumbnails)
+
+class PdfThumbnails(Frame):
+    ''' Vertical strip of page thumbnails used by PdfDisplay
+
+        Clicking a thumbnail calls command with the page index. Thumbnails are
+        kept in a ThumbnailStore as they arrive and PhotoImages are only
+        created for thumbnails in view.
+    '''
+    def __init__(self, master, command, sizes:list, bg:str, fg:str,
+                 highlight_color:str='#13ce12', font_name:str='Segoe UI',
+                 font_size:int=8, pad:int=8, label_height:int=16, scroll_px:int=40):
+        '''
+        Parameters
+        ----------
+            :param master: tk.Frame - parent widget
+            :param command: function (page_index) - called when a thumbnail is clicked
+            :param sizes: list[tuple(int, int)] - (width, height) of each thumbnail
+            :param bg: str (hex code) - background color
+            :param fg: str (hex code) - color of page numbers
+            :param highlight_color: str (hex code) - outline of current page
+            :param font_name: str - page number font name
+            :param font_size: int - page number font size
+            :param pad: int - pixels around each thumbnail
+            :param label_height: int - pixels beneath each thumbnail for the page number
+            :param scroll_px: int - pixels scrolled per mouse wheel step
+        '''
+        super().__init__(master, bg=bg)
+        self.command = command
+        self.sizes = sizes
+        self.pad, self.label_height, self.scroll_px = pad, label_height, scroll_px
+        self.store = ThumbnailStore(len(sizes))
+        self.images = {} # page index -> (canvas item, PhotoImage) for thumbnails in view
+        self.current_page = None
+        self.visible_pending = False
+
+        self.content_width = max([w for w, _ in sizes], default=0) + 2 * pad
+        self.offsets, y = [], pad
+        for _, h in sizes:
+            self.offsets.append(y)
+            y += h + label_height + pad
+        self.content_height = y
+
+        self.scroll_y = Scrollbar(self, orient='vertical')
+        self.scroll_y.pack(side='right', fill='y')
+        self.canvas = Canvas(self, bg=bg, highlightthickness=0, width=self.content_width,
+                             yscrollincrement=1, yscrollcommand=self.__yscroll,
+                             scrollregion=(0, 0, self.content_width, self.content_height))
+        self.canvas.pack(side='left', fill='y')
+        self.scroll_y.config(command=self.canvas.yview)
+        for i, (w, h) in enumerate(sizes):
+            x, y = self.get_x(i), self.offsets[i]
+            self.canvas.create_rectangle(x, y, x + w, y + h, fill='#ffffff', width=0)
+            self.canvas.create_text(self.content_width / 2, y + h + label_height / 2, text=str(i + 1),
+                                    fill=fg, font=(font_name, font_size))
+        self.highlight = self.canvas.create_rectangle(0, 0, 0, 0, outline=highlight_color,
+                                                      width=2, state='hidden')
+        self.canvas.bind('<Button-1>', self.__click)
+        self.canvas.bind('<MouseWheel>', self.__mouse_wheel)
+
+    def get_x(self, page_index:int) -> int:
+        '''returns x coordinate of left edge of thumbnail - thumbnails are centered'''
+        return (self.content_width - self.sizes[page_index][0]) // 2
+
+    def get_visible_pages(self):
+        '''returns (first, last) index of thumbnails that intersect the view'''
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first = max(0, bisect_right(self.offsets, top) - 1)
+        last = max(0, bisect_right(self.offsets, bottom) - 1)
+        return first, last
+
+    def add_thumbnails(self, first:int, thumbnails:list):
+        '''stores list of (width, height, rgb bytes) for pages starting at first'''
+        for i, (width, height, samples) in enumerate(thumbnails):
+            self.store.add(first + i, width, height, samples)
+        self.update_visible()
+
+    def update_visible(self):
+        '''draws stored thumbnails in view and frees thumbnails out of view'''
+        self.visible_pending = False
+        if not self.winfo_exists(): # removed before scheduled update
+            return
+        first, last = self.get_visible_pages()
+        for i in list(self.images):
+            if i < first or i > last:
+                self.canvas.delete(self.images.pop(i)[0])
+        for i in range(first, min(len(self.sizes), last + 1)):
+            if i not in self.images and self.store.has(i):
+                img = PhotoImage(data=self.store.get_ppm(i), master=self)
+                item = self.canvas.create_image(self.get_x(i), self.offsets[i], image=img, anchor='nw')
+                self.images[i] = (item, img)
+        self.canvas.tag_raise(self.highlight)
+
+    def set_page(self, page_index:int):
+        '''outlines thumbnail of the current page and scrolls it into view if necessary'''
+        if page_index == self.current_page or not self.sizes:
+            return
+        self.current_page = page_index
+        x, y = self.get_x(page_index), self.offsets[page_index]
+        w, h = self.sizes[page_index]
+        self.canvas.coords(self.highlight, x - 1, y - 1, x + w + 1, y + h + 1)
+        self.canvas.itemconfig(self.highlight, state='normal')
+        first, last = self.get_visible_pages()
+        if not first < page_index < last:
+            self.canvas.yview_moveto((y - self.pad) / self.content_height)
+
+    def __click(self, event):
+        '''calls command with the page that was clicked'''
+        y = self.canvas.canvasy(event.y)
+        page_index = max(0, bisect_right(self.offsets, y) - 1)
+        if self.sizes:
+            self.command(page_index)
+
+    def __yscroll(self, first, last):
+        '''called by canvas whenever the view changes - thumbnails are redrawn once the view settles'''
+        self.scroll_y.set(first, last)
+        if not self.visible_pending:
+            self.visible_pending = True
+            self.after_idle(self.update_visible)
+
+    def __mouse_wheel(self, event):
+        '''event.delta / 120 is number of scroll steps - positive for up'''
+        self.canvas.yview_scroll(int(-event.delta / 120 * self.scroll_px), 'units')
 
 class PdfWindow(Toplevel):
     ''' Window to view a single PDF File
@@ -196,7 +675,8 @@ class PdfWindow(Toplevel):
         obviously
     '''
     def __init__(self, filepath:str, bg:str, window_title='PDF Viewer',
-                 width_fact:float=0.9, height_fact:float=0.99):
+                 width_fact:float=0.9, height_fact:float=0.99, cache_dir:str=None,
+                 cache_dir_bytes:int=2**30, thumbnails:bool=False):
         '''creates window to view pdf
         
         Parameters
@@ -206,6 +686,9 @@ class PdfWindow(Toplevel):
             :param window_title: str - window name displayed in top left corner
             :param width_fact: float between 0 and 1 - percentage of screen width covered by window
             :param height_fact: float between 0 and 1 - percentage of screen height covered by window
+            :param cache_dir: str or None - optional directory where rendered pages are kept between sessions
+            :param cache_dir_bytes: int - size cap of cache_dir - least recently used pages are deleted
+            :param thumbnails: bool - if True, include sidebar with page thumbnails
         '''
         Toplevel.__init__(self)
 
@@ -216,7 +699,8 @@ class PdfWindow(Toplevel):
         self.geometry(f'{w}x{h}+{sw // 2 - w // 2}+{sh // 2 - h // 2}')
 
         pdf = PdfDisplay(self, bg, '#ffffff', view_width=150, zoom_fact=2,
-                         new_window_option=False)
+                         new_window_option=False, cache_dir=cache_dir,
+                         cache_dir_bytes=cache_dir_bytes, thumbnails=thumbnails)
         pdf.pack(fill='both', expand=True)
         pdf.show_pdf(filepath)
 
@@ -0,0 +1,465 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import OrderedDict
+from threading import local, get_ident
+from io import BytesIO
+import hashlib
+import queue
+import os
+import fitz # fitz is PyMuPDF
+from PIL import Image
+
+# not exported by chichitk - used internally by PdfDisplay
+
+
+# each worker (thread or process) keeps its most recent document open so that
+# consecutive pages of the same pdf do not re-parse the file
+_worker_state = local()
+
+def _open_document(filename:str):
+    '''returns fitz.Document for filename - reused between jobs in the same worker
+    until the file is replaced or modified, so a changed file is never rendered stale'''
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), stat.st_mtime, stat.st_size)
+    if getattr(_worker_state, 'key', None) != key:
+        close_document()
+        _worker_state.document = fitz.open(filename)
+        _worker_state.key = key
+    return _worker_state.document
+
+def close_document():
+    '''closes document kept open by the worker this is called in, if any'''
+    if getattr(_worker_state, 'document', None) is not None:
+        _worker_state.document.close()
+    _worker_state.document, _worker_state.key = None, None
+
+# MuPDF is not thread safe and holds the GIL while it renders, so threads do
+# not keep the Tk thread responsive - every MuPDF call made in this process
+# (renderers that do not use processes and reading page sizes) runs on this
+# single thread, one at a time
+_mupdf_executor = None
+
+def mupdf_executor() -> ThreadPoolExecutor:
+    '''returns the thread that runs all MuPDF work of this process - created when first needed'''
+    global _mupdf_executor
+    if _mupdf_executor is None:
+        _mupdf_executor = ThreadPoolExecutor(max_workers=1)
+    return _mupdf_executor
+
+def page_rects_job(filename:str) -> list:
+    '''returns fitz.Rect of each page of filename - run on the MuPDF thread'''
+    with fitz.open(filename) as document:
+        return [page.rect for page in document]
+
+# (path, mtime, size) -> content hash so that each file is only hashed once per session
+_file_hashes = {}
+
+def file_hash(filename:str) -> str:
+    '''returns sha1 hex digest of the contents of filename'''
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), stat.st_mtime, stat.st_size)
+    if key not in _file_hashes:
+        digest = hashlib.sha1()
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(2**20), b''):
+                digest.update(chunk)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+def page_size(rect, dpi:int):
+    '''returns (width, height) in pixels of a page rendered at dpi
+    computed from the page rect (fitz.Rect) so that no rendering is needed'''
+    irect = (rect * fitz.Matrix(dpi / 72, dpi / 72)).irect # same rounding as get_pixmap
+    return irect.width, irect.height
+
+def render_page_ppm(page, dpi:int) -> bytes:
+    '''rasterises a single fitz page and returns it as ppm bytes for PhotoImage'''
+    pix = page.get_pixmap(dpi=dpi)
+    pix1 = fitz.Pixmap(pix, 0) if pix.alpha else pix
+    return pix1.tobytes("ppm")
+
+def resize_ppm(data:bytes, width:int, height:int) -> Image.Image:
+    '''returns PIL image of ppm bytes resized to (width, height) - used for
+    previews of pages that have only been rendered at a different dpi'''
+    return Image.open(BytesIO(data)).resize((width, height), Image.BILINEAR)
+
+def write_file(path:str, data:bytes):
+    '''writes data to a temporary file which then replaces path, so that a
+    partially written file is never read - safe to call from workers'''
+    temp_path = f'{path}.{os.getpid()}.{get_ident()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def render_job(filename:str, page_index:int, dpi:int, cache_path:str=None) -> bytes:
+    '''worker entry point - renders page of filename and returns ppm bytes
+    also writes them to cache_path (see DiskPageCache.page_path) so that the
+    Tk thread does not wait for the disk
+    module level so that it can be pickled for process pools'''
+    data = render_page_ppm(_open_document(filename)[page_index], dpi)
+    if cache_path is not None:
+        try:
+            write_file(cache_path, data)
+        except OSError: # cache is optional - page is still shown
+            pass
+    return data
+
+def thumbnail_job(filename:str, first:int, last:int, dpi:int) -> list:
+    '''worker entry point - renders pages first to last - 1 of filename with a
+    single open document and returns list of (width, height, rgb bytes)'''
+    document = _open_document(filename)
+    thumbnails = []
+    for i in range(first, last):
+        pix = document[i].get_pixmap(dpi=dpi, alpha=False)
+        thumbnails.append((pix.width, pix.height, pix.samples))
+    return thumbnails
+
+
+class PageRenderer:
+    ''' Rasterises pdf pages in a background worker pool
+
+        Only the finished ppm bytes are handed back to the Tk thread. Results
+        are collected in a queue which is polled with master.after(), so the
+        callback is always called on the Tk thread and may create PhotoImages
+        or touch widgets.
+
+        With processes, pages are rendered in a pool of worker processes, so
+        rendering never blocks the Tk thread. Process pools start new
+        interpreters that import the main module, so on platforms that spawn
+        processes (Windows and macOS) the application must only create its
+        widgets under `if __name__ == '__main__':`. Without processes, jobs
+        run on the single MuPDF thread shared by every renderer (see
+        mupdf_executor) - MuPDF is not thread safe, and it holds the GIL while
+        rendering, so large pages can still stall the Tk thread.
+
+        cancel() and cancel_request() cancel queued jobs - results of jobs that
+        were already running are discarded when they arrive.
+    '''
+    def __init__(self, master, callback, workers:int=2, processes:bool=False,
+                 poll_ms:int=15):
+        '''
+        Parameters
+        ----------
+            :param master: tk widget - used to schedule polling on the Tk thread
+            :param callback: function (key, data) - called on the Tk thread with each finished render
+            :param workers: int - number of worker processes - ignored without processes
+            :param processes: bool - if True, render in a process pool instead of the shared MuPDF thread
+            :param poll_ms: int - milliseconds between checks for finished renders
+        '''
+        self.__master = master
+        self.__callback = callback
+        self.__workers, self.__processes = workers, processes
+        self.__poll_ms = poll_ms
+        self.__executor = None # created on first request
+        self.__results = queue.Queue() # (key, future) - filled by worker threads
+        self.__futures = {} # key -> future of requests that have not been delivered or cancelled
+        self.__polling = False
+
+    def __get_executor(self):
+        '''returns worker pool - created when first needed'''
+        if not self.__processes:
+            return mupdf_executor()
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(max_workers=self.__workers)
+        return self.__executor
+
+    def request(self, key, filename:str, page_index:int, dpi:int, cache_path:str=None):
+        '''
+        Purpose
+        -------
+            queues page to be rendered in the background
+            the callback will be called with key and the ppm bytes once rendered
+            does nothing if key is already being rendered
+
+        Parameters
+        ----------
+            :param key: hashable - identifies render in the callback
+            :param filename: str - path to pdf file
+            :param page_index: int - page number starting from 0
+            :param dpi: int - resolution of render
+            :param cache_path: str or None - file the worker also writes the ppm bytes to
+        '''
+        self.submit(key, render_job, filename, page_index, dpi, cache_path)
+
+    def submit(self, key, function, *args):
+        '''queues function(*args) to run in the worker pool - callback is called
+        with key and the return value of function
+        function must be module level if processes is True'''
+        if key in self.__futures:
+            return
+        future = self.__get_executor().submit(function, *args)
+        self.__futures[key] = future
+        future.add_done_callback(lambda f: self.__results.put((key, f)))
+        if not self.__polling:
+            self.__polling = True
+            self.__master.after(self.__poll_ms, self.__poll)
+
+    def is_pending(self, key) -> bool:
+        '''returns True if key has been requested and has not been delivered yet'''
+        return key in self.__futures
+
+    def get_pending(self) -> list:
+        '''returns keys that have been requested and have not been delivered yet'''
+        return list(self.__futures)
+
+    def cancel_request(self, key):
+        '''aborts render of key if it has not started - its result is discarded if it has'''
+        future = self.__futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def cancel(self):
+        '''aborts all pending renders - results of renders already in progress are discarded'''
+        for future in self.__futures.values():
+            future.cancel()
+        self.__futures = {}
+
+    def shutdown(self):
+        '''cancels pending renders and stops worker processes - the shared MuPDF thread is kept'''
+        self.cancel()
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+        elif not self.__processes:
+            mupdf_executor().submit(close_document) # do not keep the file open
+
+    def __poll(self):
+        '''called on the Tk thread - delivers finished renders that have not been cancelled'''
+        try:
+            while True:
+                try:
+                    key, future = self.__results.get_nowait()
+                except queue.Empty:
+                    break
+                if self.__futures.get(key) is not future:
+                    continue # cancelled - or requested again after it was cancelled
+                self.__futures.pop(key, None)
+                self.__callback(key, future.result()) # re-raises exception from worker
+        finally: # keep polling even if the callback raised
+            if self.__futures:
+                self.__master.after(self.__poll_ms, self.__poll)
+            else:
+                self.__polling = False
+                if not self.__processes: # idle - shared MuPDF thread does not keep the file open
+                    mupdf_executor().submit(close_document)
+
+
+class PageCache:
+    ''' Least recently used cache of rendered pages with a byte budget
+
+        Pages are stored as ppm bytes keyed on (filename, mtime, page, dpi) so
+        that edits to a file are never served from the cache. All resolutions
+        of a page are indexed together so that the closest cached render can
+        be scaled as a preview while the exact resolution is rendered.
+    '''
+    def __init__(self, max_bytes:int=2**28):
+        '''
+        Parameters
+        ----------
+            :param max_bytes: int - least recently used pages are evicted above this total size
+        '''
+        self.__max_bytes = max_bytes
+        self.__bytes = 0
+        self.__pages = OrderedDict() # (filename, mtime, page, dpi) -> bytes
+        self.__resolutions = {} # (filename, mtime, page) -> set of cached dpi
+
+    def get(self, filename:str, mtime:float, page:int, dpi:int):
+        '''returns ppm bytes or None if page is not cached at dpi'''
+        key = (filename, mtime, page, dpi)
+        if key not in self.__pages:
+            return None
+        self.__pages.move_to_end(key)
+        return self.__pages[key]
+
+    def nearest(self, filename:str, mtime:float, page:int, dpi:int):
+        '''returns (dpi, ppm bytes) of the cached resolution of page closest
+        to dpi, or None if page has not been cached at any resolution'''
+        resolutions = self.__resolutions.get((filename, mtime, page))
+        if not resolutions:
+            return None
+        # prefer downscaling a sharper render over upscaling a blurry one
+        closest = min(resolutions, key=lambda d: (abs(d - dpi), d < dpi))
+        return closest, self.get(filename, mtime, page, closest)
+
+    def put(self, filename:str, mtime:float, page:int, dpi:int, data:bytes):
+        '''adds ppm bytes to cache and evicts least recently used pages if over budget'''
+        key = (filename, mtime, page, dpi)
+        if key in self.__pages:
+            self.__pages.move_to_end(key)
+            return
+        if len(data) > self.__max_bytes:
+            return # would evict everything else
+        self.__pages[key] = data
+        self.__bytes += len(data)
+        self.__resolutions.setdefault(key[:3], set()).add(dpi)
+        while self.__bytes > self.__max_bytes:
+            old_key, old_data = self.__pages.popitem(last=False)
+            self.__bytes -= len(old_data)
+            self.__resolutions[old_key[:3]].discard(old_key[3])
+            if not self.__resolutions[old_key[:3]]:
+                del self.__resolutions[old_key[:3]]
+
+    def clear(self):
+        '''removes all pages from cache'''
+        self.__pages = OrderedDict()
+        self.__resolutions = {}
+        self.__bytes = 0
+
+    def get_size(self) -> int:
+        '''returns total size of cached pages in bytes'''
+        return self.__bytes
+
+
+class DiskPageCache:
+    ''' Persistent cache of rendered pages stored as ppm files in a directory
+
+        Pages are keyed on the content hash of the pdf, page index and dpi, so
+        a document that has been seen before is served from disk even after it
+        is renamed or the application is restarted. File modification times
+        record last use - least recently used files are deleted when the
+        directory grows beyond max_bytes. Search indexes of the same pdfs are
+        kept in the directory as well and count towards max_bytes.
+
+        Several caches may share a directory. Each keeps its own size estimate,
+        so the cap is only approximate in that case. Files written by workers
+        whose results were discarded are counted the next time the directory
+        is opened.
+    '''
+    def __init__(self, directory:str, max_bytes:int=2**30):
+        '''
+        Parameters
+        ----------
+            :param directory: str - path to cache directory - created if it does not exist
+            :param max_bytes: int - least recently used pages are deleted above this total size
+        '''
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.__sizes = {} # filename -> size in bytes
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(('.ppm', '.index.json')):
+                self.__sizes[entry.name] = entry.stat().st_size
+        self.__bytes = sum(self.__sizes.values())
+
+    def __path(self, name:str) -> str:
+        '''returns full path of file in cache directory'''
+        return os.path.join(self.__directory, name)
+
+    def get(self, content_hash:str, page:int, dpi:int):
+        '''returns ppm bytes or None if page is not cached at dpi'''
+        name = f'{content_hash}_{page}_{dpi}.ppm'
+        try:
+            with open(self.__path(name), 'rb') as f:
+                data = f.read()
+            os.utime(self.__path(name)) # mark as recently used
+        except OSError: # not cached or deleted by another cache sharing directory
+            self.__bytes -= self.__sizes.pop(name, 0)
+            return None
+        return data
+
+    def put(self, content_hash:str, page:int, dpi:int, data:bytes):
+        '''writes ppm bytes to cache and deletes least recently used pages if over budget'''
+        name = f'{content_hash}_{page}_{dpi}.ppm'
+        if name in self.__sizes or len(data) > self.__max_bytes:
+            return
+        write_file(self.__path(name), data)
+        self.__add(name, len(data))
+
+    def page_path(self, content_hash:str, page:int, dpi:int):
+        '''returns path that a render worker should write page to, or None if
+        it is already cached - call record() once it has been written'''
+        name = f'{content_hash}_{page}_{dpi}.ppm'
+        return None if name in self.__sizes else self.__path(name)
+
+    def index_path(self, content_hash:str) -> str:
+        '''returns path of the saved search index of a pdf (see SearchIndex.save)
+        - marked as recently used if it exists - call record() once it has been written'''
+        path = self.__path(f'{content_hash}.index.json')
+        try:
+            os.utime(path)
+        except OSError: # not saved yet
+            pass
+        return path
+
+    def record(self, path:str):
+        '''adds file written to path by a worker (see page_path) to the cache
+        and deletes least recently used files if over budget'''
+        name = os.path.basename(path)
+        if name in self.__sizes:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError: # worker could not write it
+            return
+        self.__add(name, size)
+
+    def __add(self, name:str, size:int):
+        '''counts file that has been written to the cache directory'''
+        self.__sizes[name] = size
+        self.__bytes += size
+        if self.__bytes > self.__max_bytes:
+            self.__evict()
+
+    def __evict(self):
+        '''deletes least recently used files until cache is within budget'''
+        def last_used(name):
+            try:
+                return os.path.getmtime(self.__path(name))
+            except OSError:
+                return 0
+        for name in sorted(self.__sizes, key=last_used):
+            if self.__bytes <= self.__max_bytes:
+                break
+            try:
+                os.remove(self.__path(name))
+            except OSError:
+                pass # already deleted
+            self.__bytes -= self.__sizes.pop(name)
+
+    def clear(self):
+        '''deletes all cached pages and search indexes'''
+        for name in list(self.__sizes):
+            try:
+                os.remove(self.__path(name))
+            except OSError:
+                pass
+        self.__sizes = {}
+        self.__bytes = 0
+
+    def get_size(self) -> int:
+        '''returns approximate total size of cached pages in bytes'''
+        return self.__bytes
+
+
+class ThumbnailStore:
+    ''' Packs raw rgb thumbnails of every page of a document into one buffer
+
+        Avoids holding a PhotoImage per page - ppm data for a single thumbnail
+        is sliced from the buffer when it is needed on screen.
+    '''
+    def __init__(self, page_num:int):
+        '''
+        Parameters
+        ----------
+            :param page_num: int - number of pages in document
+        '''
+        self.__buffer = bytearray()
+        self.__entries = [None] * page_num # (offset, width, height) of each stored page
+
+    def add(self, page:int, width:int, height:int, samples:bytes):
+        '''appends rgb samples of page to the buffer'''
+        self.__entries[page] = (len(self.__buffer), width, height)
+        self.__buffer += samples
+
+    def has(self, page:int) -> bool:
+        '''returns True if thumbnail of page has been stored'''
+        return self.__entries[page] is not None
+
+    def get_ppm(self, page:int) -> bytes:
+        '''returns thumbnail of page as ppm bytes for PhotoImage - page must be stored'''
+        offset, width, height = self.__entries[page]
+        header = f'P6 {width} {height} 255\n'.encode()
+        return header + bytes(self.__buffer[offset:offset + width * height * 3])
+
+    def get_size(self) -> int:
+        '''returns size of buffer in bytes'''
+        return len(self.__buffer)
@@ -0,0 +1,182 @@
+from collections.abc import Sequence
+import bisect
+import json
+import os
+import re
+import fitz # fitz is PyMuPDF
+
+# not exported by chichitk - used internally by PdfDisplay
+
+
+INDEX_VERSION = 1 # increment when the saved index format changes
+
+# (absolute path, mtime) -> SearchIndex so that each document is indexed once per session
+_indexes = {}
+
+def tokenize(text:str) -> list:
+    '''returns lowercase words of text without punctuation'''
+    return re.findall(r'\w+', text.lower())
+
+def get_cached_index(filename:str, mtime:float):
+    '''returns SearchIndex built earlier in this session or None'''
+    return _indexes.get((os.path.abspath(filename), mtime))
+
+def set_cached_index(filename:str, mtime:float, index):
+    '''keeps SearchIndex for filename for the rest of the session'''
+    _indexes[(os.path.abspath(filename), mtime)] = index
+
+def index_job(filename:str, cache_path:str=None):
+    '''worker entry point - returns SearchIndex of filename
+    loaded from cache_path if it exists, otherwise built and saved to cache_path'''
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            return SearchIndex.load(cache_path)
+        except (OSError, ValueError, KeyError): # corrupt or old format - rebuild
+            pass
+    index = SearchIndex.from_pdf(filename)
+    if cache_path is not None:
+        index.save(cache_path)
+    return index
+
+
+class SearchIndex:
+    ''' Inverted index of the words in a pdf
+
+        Text is extracted from every page once. Each word is split into tokens
+        that map to the positions at which they occur, so queries only look at
+        pages that contain the rarest token of the query instead of scanning
+        the document.
+
+        Rectangles are given in pdf points (72 dpi) relative to the top left
+        corner of the page.
+    '''
+    def __init__(self, page_rects:list, page_tokens:list, page_token_rects:list):
+        '''
+        Parameters
+        ----------
+            :param page_rects: list[list[tuple]] - (x0, y0, x1, y1) of each word on each page
+            :param page_tokens: list[list[str]] - tokens on each page in reading order
+            :param page_token_rects: list[list[int]] - index into page_rects of the word containing each token
+        '''
+        self.page_rects = page_rects
+        self.page_tokens = page_tokens
+        self.page_token_rects = page_token_rects
+        self.postings = {} # token -> list of (page, position)
+        for page, tokens in enumerate(page_tokens):
+            for position, token in enumerate(tokens):
+                self.postings.setdefault(token, []).append((page, position))
+
+    @classmethod
+    def from_pdf(cls, filename:str):
+        '''extracts words from every page of filename and returns SearchIndex'''
+        page_rects, page_tokens, page_token_rects = [], [], []
+        with fitz.open(filename) as document:
+            for page in document:
+                rects, tokens, token_rects = [], [], []
+                for x0, y0, x1, y1, word, *_ in page.get_text('words'):
+                    for token in tokenize(word):
+                        tokens.append(token)
+                        token_rects.append(len(rects))
+                    rects.append((round(x0, 1), round(y0, 1), round(x1, 1), round(y1, 1)))
+                page_rects.append(rects)
+                page_tokens.append(tokens)
+                page_token_rects.append(token_rects)
+        return cls(page_rects, page_tokens, page_token_rects)
+
+    @classmethod
+    def load(cls, path:str):
+        '''returns SearchIndex saved with save()'''
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data['version'] != INDEX_VERSION:
+            raise ValueError(f'Search index version {data["version"]} is not supported')
+        return cls([[tuple(r) for r in rects] for rects in data['rects']],
+                   data['tokens'], data['token_rects'])
+
+    def save(self, path:str):
+        '''writes index to path as json - written to a temporary file first so
+        that a partially written index is never loaded'''
+        data = {'version':INDEX_VERSION, 'rects':self.page_rects,
+                'tokens':self.page_tokens, 'token_rects':self.page_token_rects}
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    def search(self, query:str):
+        '''
+        Purpose
+        -------
+            finds every occurrence of the words in query, in order, ignoring
+            case and punctuation
+
+        Returns
+        -------
+            :return: SearchResults - sequence of (page, rects) of each
+                     occurrence in reading order - rects are (x0, y0, x1, y1)
+                     of the words in the occurrence
+        '''
+        query_tokens = tokenize(query)
+        length = len(query_tokens)
+        if not query_tokens:
+            return SearchResults(self, [], 0)
+        # anchor on rarest token and check the others around it
+        postings = [self.postings.get(token, []) for token in query_tokens]
+        if length == 1: # no neighbours to check - postings are the matches
+            return SearchResults(self, postings[0], 1)
+        anchor = min(range(length), key=lambda k: len(postings[k]))
+        matches = []
+        for page, position in postings[anchor]:
+            start = position - anchor
+            tokens = self.page_tokens[page]
+            if start < 0 or start + length > len(tokens):
+                continue
+            if tokens[start:start + length] == query_tokens:
+                matches.append((page, start))
+        return SearchResults(self, matches, length)
+
+    def get_rects(self, page:int, start:int, length:int) -> list:
+        '''returns rects of the words containing length tokens from position start of page'''
+        rect_ids = sorted(set(self.page_token_rects[page][start:start + length]))
+        return [self.page_rects[page][i] for i in rect_ids]
+
+    def get_page_num(self) -> int:
+        '''returns number of pages in indexed document'''
+        return len(self.page_tokens)
+
+
+class SearchResults(Sequence):
+    ''' Results of SearchIndex.search()
+
+        Behaves like a list of (page, rects) of each occurrence in reading
+        order. Only the position of each occurrence is stored - its rects are
+        looked up when it is accessed, so a common word that occurs thousands
+        of times does not make searching slow.
+    '''
+    def __init__(self, index:SearchIndex, matches:list, length:int):
+        '''
+        Parameters
+        ----------
+            :param index: SearchIndex - index that was searched
+            :param matches: list[tuple(int, int)] - (page, token position) of the start of each occurrence
+            :param length: int - number of tokens in each occurrence
+        '''
+        self.index = index
+        self.matches = matches # not copied - may be a postings list of index
+        self.length = length
+
+    def __len__(self):
+        return len(self.matches)
+
+    def __getitem__(self, n):
+        if isinstance(n, slice):
+            return [self[i] for i in range(*n.indices(len(self)))]
+        page, start = self.matches[n]
+        return page, self.index.get_rects(page, start, self.length)
+
+    def get_page(self, page:int) -> list:
+        '''returns (result number, rects) of each occurrence on page'''
+        first = bisect.bisect_left(self.matches, (page, -1))
+        last = bisect.bisect_left(self.matches, (page + 1, -1), lo=first)
+        return [(n, self.index.get_rects(page, start, self.length))
+                for n, (_, start) in enumerate(self.matches[first:last], start=first)]
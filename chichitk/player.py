@@ -1,6 +1,8 @@
 from tkinter import Frame
+import inspect
 
 from .timer import Timer
+from .frame_buffer import FrameBuffer
 from .buttons import PlayerButtons
 from .sliders import TimeSlider, PlotScrollBar, DoubleScrollBar
 
@@ -14,19 +16,30 @@ class Player(Frame):
         Includes a scrollbar for user to control playing.
         
         An example use case could be playing frames from a video
+
+        If frame_provider is given, frames are prepared ahead of playback in a
+        worker pool (see FrameBuffer) and the callback is called with each step
+        and its frame. While playing, a step whose frame is not ready yet is
+        not delivered, so slow frames are dropped instead of delaying playback.
+        Seeking drops the prepared frames - the frame at the new position is
+        waited for so that it is always shown
     '''
     def __init__(self, master:Frame, callback, delay:float, bg:str='#000000',
                  slider_type:str='single', frame_num=1000, frame_rate=29.97,
                  step_increment:int=150, end_callback=None, start_callback=None,
                  stop_callback=None, skip_callback=None, buttons_on_top=False,
                  buttons_padx_weight=6, simple_slider_width=None,
-                 limit_running_callbacks=False):
+                 limit_running_callbacks=False, tk_dispatch=False, shared_timer=False,
+                 tk_timer=False, loop=None, adaptive=False,
+                 frame_provider=None, prefetch:int=8, prefetch_workers:int=2,
+                 coalesce_scrub=False, scrub_preview=None, zoomable_slider=False):
         ''' Only keeps track of the current frame using Timer
 
         Parameters
         ----------
             :param master: tk.Frame - parent widget
             :param callback: function (step) - called with each iteration
+                                               - function (step, frame) if frame_provider is given
             :param delay: float - seconds between each iteration
                                 - would be based on frame rate for video player
             :param bg: str - background color
@@ -43,13 +56,41 @@ class Player(Frame):
             :param buttons_padx_weight: int - weight of padding for PlayerButtons
             :param limit_running_callbacks: bool - if True, does not call callback function immediately when slider is moved while running
                                                  - to avoid calling the callback function in multiple different threads
+            :param tk_dispatch: bool - if True, callbacks during playback are called on the Tk thread instead of the timer thread
+                                     - frames are dropped if the callback cannot keep up
+            :param shared_timer: bool - if True, timer runs on the shared TimerScheduler thread instead of its own thread
+            :param tk_timer: bool - if True, timer is driven by the Tk event loop (after) - no threads
+            :param loop: asyncio event loop or None - if given, timer runs on the loop and callback may be
+                                                    a coroutine function - see chichitk.async_mainloop
+            :param adaptive: bool - if True, only every k-th frame is delivered while the callback cannot
+                                    keep up so that playback stays smooth at a lower rate - see Timer
+            :param frame_provider: function (step) -> frame - called in worker threads to prepare frames
+                                                             ahead of playback - must not return None
+            :param prefetch: int - number of frames kept ready when frame_provider is given
+            :param prefetch_workers: int - number of threads calling frame_provider - use 1 if frame_provider
+                                           is not thread safe (frames are then prepared in order)
+            :param coalesce_scrub: bool - if True, dragging the slider delivers only the latest step, at most once per
+                                          display refresh, and the exact step on release - 'single' and 'double' only
+            :param scrub_preview: function (step) or None - called instead of callback while dragging the slider with
+                                                            coalesce_scrub - to show a cheaper preview until release
+            :param zoomable_slider: bool - if True, slider timeline can be zoomed with the mouse wheel and panned by
+                                           dragging below the axis - 'single' and 'double' only - see PlotScrollBar
         '''
         self.__callback = callback
         self.__end_callback = end_callback
+        self.__skip_callback = skip_callback
+        self.__scrub_preview = scrub_preview
+        self.__prefetch, self.__prefetch_workers = prefetch, prefetch_workers
+        self.__Buffer = None
+        self.__not_ready = 0 # steps dropped because their frame was not ready
+        if frame_provider is not None:
+            self.__Buffer = FrameBuffer(frame_provider, size=prefetch, workers=prefetch_workers,
+                                        frame_num=frame_num)
         self.__frame_rate = frame_rate
         self.__step_increment = step_increment
         self.__slider_type = slider_type
         self.__limit_running_callbacks = limit_running_callbacks
+        self.__loop = loop
         super().__init__(master, bg=bg)
 
         # compute sides for widget packing
@@ -59,7 +100,10 @@ class Player(Frame):
 
         self.__Timer = Timer(delay, self.__timer_update, end_callback=self.__end,
                              start_callback=start_callback, stop_callback=stop_callback,
-                             skip_callback=skip_callback, min_step=0, max_step=frame_num)
+                             skip_callback=self.__skip, min_step=0, max_step=frame_num,
+                             master=self if tk_dispatch or tk_timer else None,
+                             shared=shared_timer, tk_loop=tk_timer, loop=loop,
+                             adaptive=adaptive)
 
         if slider_type == 'simple':
             self.__Slider = TimeSlider(self, self.__slider_update, bg=bg,
@@ -70,11 +114,15 @@ class Player(Frame):
         elif slider_type == 'single':
             self.__Slider = PlotScrollBar(self, self.__slider_update, None, frame_num,
                                           min_frame=0, start_frame=0, frame_rate=self.__frame_rate,
-                                          height=60, bg=bg)
+                                          height=60, bg=bg, coalesce=coalesce_scrub,
+                                          preview_command=self.__get_preview_command(),
+                                          zoomable=zoomable_slider)
         elif slider_type == 'double':
             self.__Slider = DoubleScrollBar(self, self.__slider_update, None, frame_num,
                                             min_frame=0, start_frame=0, frame_rate=self.__frame_rate,
-                                            bg=bg)
+                                            bg=bg, coalesce=coalesce_scrub,
+                                            preview_command=self.__get_preview_command(),
+                                            zoomable=zoomable_slider)
         self.__Slider.pack(side=slider_side, fill='x')
 
         self.__Buttons = PlayerButtons(self, bg, self.__Timer.start, self.__Timer.stop,
@@ -118,11 +166,13 @@ class Player(Frame):
         self.__Timer.set(frame)
         self.__Slider.set_frame(frame)
         if callback:
-            self.__callback(frame)
+            self.__call(frame)
 
     def set_frame_num(self, frame_num:int):
         '''updates number of steps - pushes to timer and scrollbar'''
         self.__Timer.set_max_step(frame_num)
+        if self.__Buffer is not None:
+            self.__Buffer.set_frame_num(frame_num)
         self.__Slider.set_frame_num(frame_num, self.__frame_rate)
 
     def set_frame_rate(self, frame_rate:float):
@@ -131,6 +181,17 @@ class Player(Frame):
         self.__Timer.set_delay(1 / self.__frame_rate)
         self.__Slider.set_frame_num(self.__Timer.get_max_step(), self.__frame_rate)
 
+    def set_frame_provider(self, frame_provider):
+        '''replaces frame provider - prepared frames are dropped
+        frame_provider: function (step) -> frame or None to call callback with steps only'''
+        if self.__Buffer is not None:
+            self.__Buffer.shutdown()
+            self.__Buffer = None
+        if frame_provider is not None:
+            self.__Buffer = FrameBuffer(frame_provider, size=self.__prefetch,
+                                        workers=self.__prefetch_workers,
+                                        frame_num=self.__Timer.get_max_step())
+
     def set_delay(self, delay:float):
         '''updates delay of timer
         intended for when Player is not being used to play video frames'''
@@ -147,6 +208,24 @@ class Player(Frame):
         '''returns the current step'''
         return self.__Timer.get_step()
 
+    def stats(self) -> dict:
+        '''returns counts of delivered, skipped and late frames - see Timer.stats()
+        also contains not_ready: int - frames dropped because frame_provider had not prepared them yet
+        (these are included in delivered because the timer delivered them to the player)'''
+        stats = self.__Timer.stats()
+        stats['not_ready'] = self.__not_ready
+        return stats
+
+    def reset_stats(self):
+        '''clears counters returned by stats()'''
+        self.__Timer.reset_stats()
+        self.__not_ready = 0
+
+    def steps(self):
+        '''returns async iterator over the steps of the player while it plays
+        requires loop - see Timer.steps()'''
+        return self.__Timer.steps()
+
     def get_delay(self) -> float:
         '''returns delay between callbacks (seconds)'''
         return self.__Timer.get_delay()
@@ -163,17 +242,60 @@ class Player(Frame):
         '''returns True if Player is running, otherwise False'''
         return self.__Timer.is_running()
 
+    def __call(self, step:int):
+        '''calls callback - coroutine callbacks are run as a task on loop'''
+        result = self.__deliver(step, wait=True)
+        if self.__loop is not None and inspect.isawaitable(result):
+            self.__loop.create_task(result)
+
+    def __deliver(self, step:int, wait:bool):
+        '''calls callback with step and its frame if there is a frame provider
+        if wait is False and the frame is not ready, callback is not called'''
+        if self.__Buffer is None:
+            return self.__callback(step)
+        frame = self.__Buffer.get(step, wait=wait)
+        if frame is not None:
+            return self.__callback(step, frame)
+        self.__not_ready += 1
+        return None
+
     def __timer_update(self, step:int):
-        '''called by timer when playing'''
+        '''called by timer when playing - returns coroutine of an async callback
+        so that timer waits for it before delivering the next step
+        also called by timer after skipping while stopped - frame is waited for'''
         self.__Slider.set_frame(step)
-        self.__callback(step)
+        return self.__deliver(step, wait=not self.is_running())
+
+    def __get_preview_command(self):
+        '''returns command given to slider for previews while scrubbing'''
+        return self.__slider_preview if self.__scrub_preview is not None else None
+
+    def __slider_preview(self, step:int):
+        '''called while slider is dragged with coalesce_scrub and scrub_preview
+        the callback is called with the final step when the slider is released'''
+        self.__Timer.set(step)
+        self.__scrub_preview(step)
+
+    def __skip(self, step:int):
+        '''called by timer when the step is changed other than by playing'''
+        if self.__Buffer is not None: # prepared frames are around the old step
+            self.__Buffer.invalidate()
+        if self.__skip_callback is not None:
+            return self.__skip_callback(step) # timer runs coroutine of an async skip callback
 
     def __slider_update(self, step:int):
         '''called when slider is moved by user
         it does not matter whether timer is running or not'''
         self.__Timer.set(step)
         if self.__callback_status():
-            self.__callback(step)
+            self.__call(step)
+
+    def destroy(self):
+        '''stops player and frame provider workers before destroying widget'''
+        self.__Timer.stop()
+        if self.__Buffer is not None:
+            self.__Buffer.shutdown()
+        super().destroy()
 
     def __end(self):
         '''called when player reaches the end (max step)'''
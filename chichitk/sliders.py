@@ -5,6 +5,7 @@ import numpy as np
 from .tool_tip import ToolTip
 from .labels import NumberEditLabel
 from .canvas_items import CanvasEditLine, CanvasEditFill, brighten
+from .decimate import SeriesDecimator
 
 __all__ = ['Slider', 'TimeSlider', 'HorizontalSlider', 'VerticalSlider', 'ScrollBar',
            'HorizontalSliderGroup', 'VerticalSliderGroup', 'PlotScrollBar', 'DoubleScrollBar', 'brighten']
@@ -761,6 +762,25 @@ class PlotScrollBar(Canvas):
         Values are displayed to the user in seconds (formatted m:ss), but on the
         backend, values are given in frames. This is ideal if you are using the
         slider to control video playback
+
+        With coalesce=True, dragging the slider does not call command for every
+        mouse motion. Only the latest frame is delivered, at most once every
+        coalesce_ms, and the exact frame is delivered when the slider is
+        released. If preview_command is given, it is called during the drag
+        instead of command, so that a cheaper preview can be shown until the
+        slider is released
+
+        With zoomable=True, only a window (the view) of the frames is shown.
+        The mouse wheel zooms in and out around the cursor, and dragging below
+        the axis line pans the view. Ticks are only generated for the view, so
+        precise seeking is possible in very long recordings. The view follows
+        the current frame when it is set outside of the view
+
+        A data series such as an audio signal can be drawn above the axis with
+        set_series(). It is drawn as a single polygon of the minimum and
+        maximum of the samples in each pixel column (see SeriesDecimator), so
+        redrawing depends on the width of the scrollbar and not the number of
+        samples
     '''
     def __init__(self, master, command, label, frames=100, min_frame=0, start_frame=1,
                  frame_rate=29.97, height=72, padx=0.04, active_color='#e8ff00',
@@ -769,7 +789,9 @@ class PlotScrollBar(Canvas):
                  show_fill=False, active_fill=False, confine_to_active_region=False,
                  fill_text='', active_x0=0, active_x1=0, mouse_wheel_steps=1,
                  active_fill_callback=None, font_name='Segoe UI', label_font_size=10,
-                 tick_font_size=9, active=True):
+                 tick_font_size=9, active=True, coalesce=False, coalesce_ms=16,
+                 preview_command=None, zoomable=False, min_view_frames=10,
+                 zoom_factor=1.25, view_callback=None):
         '''        
         Parameters
         ----------
@@ -786,9 +808,30 @@ class PlotScrollBar(Canvas):
             :param (active_x0 active_x1) : (int, int) - start and end of active range
             :param active_fill_callback: 2 argument function (active_x0, active_x1) - called whenever active region is changed
             :param active: bool - if False, scrollbar will be unresponsive to user interactions - for toggling
+            :param coalesce: bool - if True, frames are delivered at most once every coalesce_ms while dragging
+            :param coalesce_ms: int - milliseconds between deliveries while dragging - 16 is about one display refresh
+            :param preview_command: function (int) or None - called instead of command while dragging if coalesce is True
+                                                           - command is called with the final frame on release
+            :param zoomable: bool - if True, mouse wheel zooms and dragging below the axis pans instead of scrolling
+            :param min_view_frames: int - smallest number of frames shown when zoomed in
+            :param zoom_factor: float - view is scaled by zoom_factor for each mouse wheel step
+            :param view_callback: 2 argument function (view_min, view_max) - called whenever the view is changed by user
         '''
         Canvas.__init__(self, master, bg=bg, height=height, highlightthickness=0)
         self.command = command # function acception 1 numeric argument
+        self.coalesce, self.coalesce_ms = coalesce, coalesce_ms
+        self.preview_command = preview_command
+        self.scrub_id = None # pending after() of deliver_scrub
+        self.scrub_frame = None # last frame given to command during the current drag
+        self.scrubbing = False # True while the main line is dragged with coalesce
+        self.zoomable, self.min_view_frames, self.zoom_factor = zoomable, min_view_frames, zoom_factor
+        self.view_callback = view_callback
+        self.view_min, self.view_max = min_frame, frames # frames shown - whole range unless zoomable
+        self.pan_start = None # (cursor x, view_min) while view is dragged
+        self.series = None # SeriesDecimator
+        self.series_id = None # canvas polygon of series
+        self.series_color = '#3a7bd5'
+        self.series_start, self.series_end = 0, 0 # frames at first and after last sample
         self.active_fill_callback = active_fill_callback
         self.label = label # can be none to display no label
         self.mouse_wheel_steps = mouse_wheel_steps
@@ -804,11 +847,17 @@ class PlotScrollBar(Canvas):
         self.min_seconds, self.max_seconds = self.min_frame / frame_rate, self.max_frame / frame_rate
         self.width = None
         self.xmin, self.xmax = 0, 1 # only needed before Canvas has been rendered - '<Configure>'
+        self.draw_id = None # pending after_idle() of idle_draw
+        # axis items are created once and moved by draw()
+        self.axis_id, self.label_id = None, None
+        self.tick_ids = [] # (line id, text id) of each tick - surplus ticks are hidden
+        self.tick_texts = [] # text of each tick in tick_ids - None if hidden
         if self.label:
             self.label_line_height, self.tick_height = height * 0.5, height * 0.59
         else:
             self.label_line_height, self.tick_height = height * 0.65, height * 0.76
-        self.divisions = np.array([1/2**i for i in range(4, 0, -1)] + [1, 2, 5, 10, 25, 50, 100]) # smallest is 0.0625 (1/16)
+        self.divisions = np.array([1/2**i for i in range(4, 0, -1)] + [1, 2, 5, 10, 25, 50, 100] +
+                                  [300, 600, 1800, 3600, 7200, 18000, 36000]) # smallest is 0.0625 (1/16) - largest is 10 hours
 
         if self.show_fill:
             self.Fill = CanvasEditFill(self, 'sb_fill', 0, 0, 0, self.label_line_height, line_width=2, bg=active_fill_color,
@@ -822,17 +871,28 @@ class PlotScrollBar(Canvas):
                                    hover_color=self.hover_color, selectable=False,
                                    hoverable=True, draggable=True, deletable=False,
                                    show_drag_color=True, drag_function=self.main_drag,
-                                   active=active)
+                                   release_function=self.main_release, active=active)
 
         self.bind('<Configure>', self.frame_width)
         self.bind('<MouseWheel>', self.mouse_wheel_scroll)
+        if self.zoomable:
+            self.bind('<Button-1>', self.pan_click)
+            self.bind('<B1-Motion>', self.pan_drag)
+            self.bind('<ButtonRelease-1>', self.pan_release)
         self.event_generate('<Configure>', when='tail')
 
     def frame_width(self, event):
-        '''called whenever window is resized'''
+        '''called whenever window is resized - drawing waits until idle so
+        that several resizes in one event cycle cause a single draw'''
         self.width = event.width
         self.xmin = self.width * self.padx
         self.xmax = self.width * (1 - self.padx)
+        if self.draw_id is None:
+            self.draw_id = self.after_idle(self.idle_draw)
+
+    def idle_draw(self):
+        '''called when idle after the window has been resized'''
+        self.draw_id = None
         self.draw()
 
     def get_status(self):
@@ -848,14 +908,85 @@ class PlotScrollBar(Canvas):
         self.frame_rate = frame_rate
         self.min_frame, self.max_frame = min_frame, max_frame
         self.min_seconds, self.max_seconds = self.min_frame / self.frame_rate, self.max_frame / self.frame_rate
+        if self.zoomable: # keep view inside the new bounds
+            self.view_min, self.view_max = self.clamp_view(self.view_min, self.view_max)
+        else:
+            self.view_min, self.view_max = self.min_frame, self.max_frame
         self.update_active_region()
         self.draw()
 
     def set_frame(self, frame:int):
-        '''set the slider position'''
+        '''set the slider position - moves view to include frame if zoomable'''
         self.current_frame = frame
+        if self.zoomable and not self.view_min < frame <= self.view_max:
+            width = self.view_max - self.view_min # frame is put near the left of the view
+            view_min = frame - 1 - int(width * 0.1)
+            self.set_view(view_min, view_min + width, callback=True)
         self.update_line_x()
 
+    def clamp_view(self, view_min:int, view_max:int):
+        '''returns view_min and view_max inside frame bounds and at least min_view_frames apart'''
+        full = self.max_frame - self.min_frame
+        width = min(full, max(self.min_view_frames, view_max - view_min))
+        view_min = min(self.max_frame - width, max(self.min_frame, view_min))
+        return int(view_min), int(view_min + width)
+
+    def set_view(self, view_min:int, view_max:int, callback=False):
+        '''
+        Purpose
+        -------
+            shows frames view_min to view_max - only has an effect if zoomable
+            view is kept inside the frame bounds
+
+        Parameters
+        ----------
+            :param view_min: int - frame at left edge of axis
+            :param view_max: int - frame at right edge of axis
+            :param callback: bool - if True, view_callback is called
+        '''
+        if not self.zoomable:
+            return
+        view_min, view_max = self.clamp_view(view_min, view_max)
+        if (view_min, view_max) == (self.view_min, self.view_max):
+            return
+        self.view_min, self.view_max = view_min, view_max
+        self.draw()
+        if callback and self.view_callback:
+            self.view_callback(self.view_min, self.view_max)
+
+    def get_view(self):
+        '''returns (view_min, view_max) - frames at the edges of the axis'''
+        return self.view_min, self.view_max
+
+    def zoom(self, factor:float, x:float=None):
+        '''scales view by factor (< 1 zooms in) keeping the frame at x coordinate in place
+        x defaults to the center of the axis'''
+        if x is None:
+            x = (self.xmin + self.xmax) / 2
+        x_perc = min(1, max(0, (x - self.xmin) / (self.xmax - self.xmin)))
+        anchor = self.view_min + (self.view_max - self.view_min) * x_perc
+        width = (self.view_max - self.view_min) * factor
+        view_min = round(anchor - width * x_perc)
+        self.set_view(view_min, view_min + round(width), callback=True)
+
+    def pan_click(self, event):
+        '''starts dragging the view if the click is below the axis line (not on the line or fill)'''
+        if event.y > self.label_line_height:
+            self.pan_start = (event.x, self.view_min)
+
+    def pan_drag(self, event):
+        '''moves view with cursor'''
+        if self.pan_start is None:
+            return
+        x, view_min = self.pan_start
+        frames_per_pixel = (self.view_max - self.view_min) / (self.xmax - self.xmin)
+        view_min += int(round((x - event.x) * frames_per_pixel))
+        self.set_view(view_min, view_min + self.view_max - self.view_min, callback=True)
+
+    def pan_release(self, event):
+        '''stops dragging the view'''
+        self.pan_start = None
+
     def set_active(self):
         '''sets state to active so that scrollbar will be responsive to user interactions'''
         self.Line.set_active()
@@ -879,14 +1010,16 @@ class PlotScrollBar(Canvas):
             
     def get_frame_x(self, frame:int) -> float:
         '''returns the x coordinate corresponding to the given frame'''
-        if self.max_frame - self.min_frame == 0:
+        if self.view_max - self.view_min == 0:
             return self.xmin
-        return self.xmin + (self.xmax - self.xmin) * (frame - self.min_frame) / (self.max_frame - self.min_frame)
+        return self.xmin + (self.xmax - self.xmin) * (frame - self.view_min) / (self.view_max - self.view_min)
     
     def x_coord_to_frame(self, x:float) -> int:
         '''converts x coordinate to frame - returns int'''
         x_perc = (x - self.xmin) / (self.xmax - self.xmin)
-        frame = int(self.min_frame + (self.max_frame - self.min_frame) * x_perc)
+        frame = int(self.view_min + (self.view_max - self.view_min) * x_perc)
+        if self.zoomable: # line stays inside the view
+            frame = min(self.view_max, max(self.view_min + 1, frame))
         return min(self.max_frame, max(self.min_frame + 1, frame))
             
     def update_line_x(self):
@@ -971,9 +1104,38 @@ class PlotScrollBar(Canvas):
             frame = min(self.active_x1 - 1, max(self.active_x0 + 1, frame))
         if frame != self.current_frame:
             self.current_frame = frame
-            self.command(self.current_frame - 1)
+            if self.coalesce:
+                self.schedule_scrub()
+            else:
+                self.command(self.current_frame - 1)
             self.update_active_region()
         return self.get_frame_x(self.current_frame) # to update line position
+
+    def schedule_scrub(self):
+        '''called while dragging with coalesce - delivers the current frame in
+        coalesce_ms unless a delivery is already scheduled'''
+        self.scrubbing = True
+        if self.scrub_id is None:
+            self.scrub_id = self.after(self.coalesce_ms, self.deliver_scrub)
+
+    def deliver_scrub(self):
+        '''calls preview_command or command with the latest frame reached while dragging'''
+        self.scrub_id = None
+        if self.preview_command is not None:
+            self.preview_command(self.current_frame - 1)
+        elif self.current_frame != self.scrub_frame:
+            self.scrub_frame = self.current_frame
+            self.command(self.current_frame - 1)
+
+    def main_release(self, x:float):
+        '''called when main line is released - delivers the exact final frame of a coalesced drag'''
+        if self.scrub_id is not None:
+            self.after_cancel(self.scrub_id)
+            self.scrub_id = None
+        if self.scrubbing:
+            if self.preview_command is not None or self.current_frame != self.scrub_frame:
+                self.command(self.current_frame - 1)
+            self.scrubbing, self.scrub_frame = False, None
     
     def active_drag(self, x0:float, x1:float, cursor_x:float, new_x0:float, new_x1:float):
         '''called whenever the active fill is dragged
@@ -1063,7 +1225,11 @@ class PlotScrollBar(Canvas):
         return True
 
     def mouse_wheel_scroll(self, event):
-        '''event.delta / 120 is float - number of scroll steps - positive for up, negative for down'''
+        '''event.delta / 120 is float - number of scroll steps - positive for up, negative for down
+        zooms around the cursor instead if zoomable'''
+        if self.zoomable:
+            self.zoom(self.zoom_factor ** (-event.delta / 120), event.x)
+            return
         frame = min(self.max_frame, max(self.min_frame + 1, int(self.current_frame + event.delta / 120 * self.mouse_wheel_steps)))
         if self.confine_to_active_region: # do not allow user to move scrollbar outside of active region
             frame = min(self.active_x1 - 1, max(self.active_x0 + 1, frame))
@@ -1076,33 +1242,122 @@ class PlotScrollBar(Canvas):
         for i in self.find_all():
             if i != self.Line.id and (not self.show_fill or i != self.Fill.box_id):
                 self.delete(i)
+        self.axis_id, self.label_id = None, None
+        self.tick_ids, self.tick_texts = [], []
+        self.series_id = None
+
+    def set_series(self, data, color:str='#3a7bd5', start_frame:int=None, end_frame:int=None):
+        '''
+        Purpose
+        -------
+            draws data series above the axis, behind the main line
+            samples are spread evenly from start_frame to end_frame
+
+        Parameters
+        ----------
+            :param data: 1d numpy array or SeriesDecimator - samples of the series
+                         - pass the same SeriesDecimator to several scrollbars to share its cache
+            :param color: str (hex code) - color of series
+            :param start_frame: int or None - frame of the first sample - default is min_frame
+            :param end_frame: int or None - frame after the last sample - default is max_frame
+        '''
+        self.series = data if isinstance(data, SeriesDecimator) else SeriesDecimator(data)
+        self.series_color = color
+        self.series_start = self.min_frame if start_frame is None else start_frame
+        self.series_end = self.max_frame if end_frame is None else end_frame
+        if self.series_id is not None:
+            self.itemconfig(self.series_id, fill=color, outline=color)
+        self.draw_series()
+
+    def clear_series(self):
+        '''removes data series'''
+        self.series = None
+        if self.series_id is not None:
+            self.delete(self.series_id)
+            self.series_id = None
+
+    def draw_series(self, margin:int=2):
+        '''updates polygon of data series for the current view and width'''
+        if self.series is None or not self.width:
+            return
+        width = max(1, int(self.xmax - self.xmin))
+        samples_per_frame = len(self.series) / max(1, self.series_end - self.series_start)
+        start = (self.view_min - self.series_start) * samples_per_frame
+        end = (self.view_max - self.series_start) * samples_per_frame
+        columns, mins, maxs = self.series.columns(start, end, width)
+        if self.series_id is None:
+            # disabled so that clicks reach the active region fill underneath
+            self.series_id = self.create_polygon(0, 0, 0, 0, 0, 0, fill=self.series_color,
+                                                 outline=self.series_color, width=1, state='disabled')
+            self.tag_lower(self.series_id, self.Line.id) # above fill, below main line
+        if len(columns) < 2: # polygon needs at least 3 points
+            self.itemconfig(self.series_id, state='hidden')
+            return
+        # scale values between margin and axis line
+        low, high = self.series.get_range()
+        y0, y1 = self.label_line_height - margin, margin
+        scale = (y1 - y0) / (high - low) if high > low else 0
+        xs = self.xmin + (columns + 0.5) * (self.xmax - self.xmin) / width
+        top = np.column_stack((xs, y0 + (maxs - low) * scale)) # left to right along maximums
+        bottom = np.column_stack((xs, y0 + (mins - low) * scale))[::-1] # right to left along minimums
+        points = np.nan_to_num(np.concatenate((top, bottom)), nan=y0)
+        self.coords(self.series_id, *points.ravel().tolist())
+        self.itemconfig(self.series_id, state='disabled')
 
     def draw(self, max_ticks=15, tick_x_buffer=0.01):
         '''draws label line and ticks/labels on canvas
-        updates position of main scroll line and active region fill'''
+        updates position of main scroll line and active region fill
+        existing items are moved instead of recreated - text is only changed
+        for ticks whose label changed'''
         if not self.width:
             # width will not be set for sliders on subsequent pages that have not be loaded yet
             return None
-        self.remove()
         self.update_line_x()
         self.update_fill_x(callback=False)
-        self.create_line(self.xmin, self.label_line_height, self.xmax,
-                         self.label_line_height, fill='#ffffff', width=1)
-        if self.label != None:
-            self.create_text(self.width / 2, self.height, text=self.label,
-                             fill='#ffffff', font=(self.font_name, self.label_font_size),
-                             anchor='s')
-        
-        # draw ticks and labels
-        increment = self.divisions[self.divisions > (self.max_seconds - self.min_seconds) / max_ticks].min()
-        ticks = np.arange(int(self.min_seconds / increment), int(self.max_seconds / increment) + 1) * increment # in seconds
-        for sec, label in zip(ticks, [seconds_text(t) for t in ticks]):
-            x = self.xmin + (self.xmax - self.xmin) * (sec - self.min_seconds) / (self.max_seconds - self.min_seconds)
+        if self.axis_id is None:
+            self.axis_id = self.create_line(0, 0, 0, 0, fill='#ffffff', width=1)
+            if self.label != None:
+                self.label_id = self.create_text(0, 0, text=self.label, fill='#ffffff',
+                                                 font=(self.font_name, self.label_font_size),
+                                                 anchor='s')
+        self.coords(self.axis_id, self.xmin, self.label_line_height, self.xmax, self.label_line_height)
+        if self.label_id is not None:
+            self.coords(self.label_id, self.width / 2, self.height)
+
+        # find visible ticks and labels - only ticks inside the view are generated
+        view_min_seconds, view_max_seconds = self.view_min / self.frame_rate, self.view_max / self.frame_rate
+        divisions = self.divisions[self.divisions > (view_max_seconds - view_min_seconds) / max_ticks]
+        increment = divisions.min() if len(divisions) > 0 else self.divisions.max()
+        ticks = np.arange(int(view_min_seconds / increment), int(view_max_seconds / increment) + 1) * increment # in seconds
+        visible = [] # (x, label)
+        for sec in ticks:
+            x = self.xmin + (self.xmax - self.xmin) * (sec - view_min_seconds) / (view_max_seconds - view_min_seconds)
             if x + (self.xmax - self.xmin) * tick_x_buffer >= self.xmin and x - (self.xmax - self.xmin) * tick_x_buffer <= self.xmax:
-                self.create_line(x, self.label_line_height, x, self.tick_height,
-                                 fill='#ffffff', width=1)
-                self.create_text(x, self.tick_height, text=label, fill='#ffffff',
-                                 font=(self.font_name, self.tick_font_size), anchor='n')
+                visible.append((x, seconds_text(sec)))
+
+        # draw ticks and labels - create items only if there are more ticks than ever before
+        while len(self.tick_ids) < len(visible):
+            self.tick_ids.append((self.create_line(0, 0, 0, 0, fill='#ffffff', width=1),
+                                  self.create_text(0, 0, text='', fill='#ffffff',
+                                                   font=(self.font_name, self.tick_font_size), anchor='n')))
+            self.tick_texts.append('')
+        for i, (line_id, text_id) in enumerate(self.tick_ids):
+            if i >= len(visible):
+                if self.tick_texts[i] is not None:
+                    self.itemconfig(line_id, state='hidden')
+                    self.itemconfig(text_id, state='hidden')
+                    self.tick_texts[i] = None
+                continue
+            x, label = visible[i]
+            self.coords(line_id, x, self.label_line_height, x, self.tick_height)
+            self.coords(text_id, x, self.tick_height)
+            if self.tick_texts[i] is None:
+                self.itemconfig(line_id, state='normal')
+                self.itemconfig(text_id, state='normal')
+            if self.tick_texts[i] != label:
+                self.itemconfig(text_id, text=label)
+                self.tick_texts[i] = label
+        self.draw_series()
 
 class DoubleScrollBar(Frame):
     ''' Extension of PlotScrollBar that combines to PlotScrollBars to give user
@@ -1115,6 +1370,11 @@ class DoubleScrollBar(Frame):
         Just like PlotScrollBar, there is a single callback command that is
         called whenever the slider value is changed, either by the top or bottom
         PlotScrollBar
+
+        With zoomable=True, the bottom scrollbar is a zoomable PlotScrollBar
+        whose view is the active region - zooming or panning the bottom
+        scrollbar moves the active region, and dragging the active region moves
+        the view of the bottom scrollbar
     '''
     def __init__(self, master, command, label, frames=100, min_frame=0, start_frame=1,
                  frame_rate=29.97, main_height=60, secondary_height=60, padx=0.04,
@@ -1122,7 +1382,9 @@ class DoubleScrollBar(Frame):
                  hover_color='#ffffff', bg='#000000', active_fill_color='#005500',
                  fill_text='', mouse_wheel_steps=1, secondary_width_perc=0.2,
                  font_name='Segoe UI', label_font_size=10, tick_font_size=9,
-                 confine_to_active_region=False, active_fill=True, active=True):
+                 confine_to_active_region=False, active_fill=True, active=True,
+                 coalesce=False, coalesce_ms=16, preview_command=None, zoomable=False,
+                 min_view_frames=10):
         '''Double version of PlotScrollBar - main scrollbar on top and secondary scrollbar beneath for precise seeking
         top scrollbar has interactable fill to control the bounds of bottom scrollbar
         
@@ -1139,14 +1401,26 @@ class DoubleScrollBar(Frame):
             :param confine_to_active_region: bool - if True, user will not be allowed to move scrollbar outside of active region
             :param active_fill: bool - if True, active region of MainScrollBar can be adjusted by user
             :param active: bool - if False, scrollbar will be unresponsive to user interactions - for toggling
+            :param coalesce: bool - if True, frames are delivered at most once every coalesce_ms while dragging - see PlotScrollBar
+            :param coalesce_ms: int - milliseconds between deliveries while dragging
+            :param preview_command: function (int) or None - called instead of command while dragging if coalesce is True
+            :param zoomable: bool - if True, bottom scrollbar can be zoomed and panned to change the active region
+            :param min_view_frames: int - smallest active region when zoomable
         '''
         Frame.__init__(self, master, bg=bg)
+        self.zoomable = zoomable
         self.command = command
+        self.preview_command = preview_command
+        main_preview = self.__main_preview if preview_command is not None else None
+        secondary_preview = self.__secondary_preview if preview_command is not None else None
         self.secondary_width_perc = secondary_width_perc
         self.frame_rate = frame_rate
 
         active_x0, active_x1 = self.get_active_bounds(start_frame, min_frame, frames, self.secondary_width_perc)   
-        fill_callback = lambda f0, f1: self.SecondaryScrollBar.set_frame_num(f1, self.frame_rate, min_frame=f0 + 1)     
+        if zoomable: # bottom scrollbar covers every frame and shows the active region as its view
+            fill_callback = lambda f0, f1: self.SecondaryScrollBar.set_view(f0, f1)
+        else:
+            fill_callback = lambda f0, f1: self.SecondaryScrollBar.set_frame_num(f1, self.frame_rate, min_frame=f0 + 1)
         self.MainScrollBar = PlotScrollBar(self, self.__main_command, None,
                                            frames=frames, min_frame=min_frame,
                                            start_frame=start_frame, height=main_height,
@@ -1161,10 +1435,11 @@ class DoubleScrollBar(Frame):
                                            tick_font_size=tick_font_size, active=active,
                                            confine_to_active_region=confine_to_active_region,
                                            active_fill_callback=fill_callback,
-                                           frame_rate=self.frame_rate)
+                                           frame_rate=self.frame_rate, coalesce=coalesce,
+                                           coalesce_ms=coalesce_ms, preview_command=main_preview)
         self.SecondaryScrollBar = PlotScrollBar(self, self.__secondary_command,
-                                                label, frames=self.MainScrollBar.active_x1,
-                                                min_frame=self.MainScrollBar.active_x0,
+                                                label, frames=frames if zoomable else self.MainScrollBar.active_x1,
+                                                min_frame=min_frame if zoomable else self.MainScrollBar.active_x0,
                                                 start_frame=start_frame,
                                                 height=secondary_height, padx=padx,
                                                 active_color=active_color, inactive_color=inactive_color,
@@ -1173,7 +1448,11 @@ class DoubleScrollBar(Frame):
                                                 mouse_wheel_steps=mouse_wheel_steps,
                                                 font_name=font_name, label_font_size=label_font_size,
                                                 tick_font_size=tick_font_size, active=active,
-                                                frame_rate=self.frame_rate)
+                                                frame_rate=self.frame_rate, coalesce=coalesce,
+                                                coalesce_ms=coalesce_ms, preview_command=secondary_preview,
+                                                zoomable=zoomable, min_view_frames=min_view_frames,
+                                                view_callback=self.__secondary_view)
+        self.SecondaryScrollBar.set_view(self.MainScrollBar.active_x0, self.MainScrollBar.active_x1)
         self.MainScrollBar.pack(side='top', fill='x')
         self.SecondaryScrollBar.pack(side='top', fill='x')
 
@@ -1210,9 +1489,39 @@ class DoubleScrollBar(Frame):
         self.MainScrollBar.set_frame(frame)
         self.command(frame)
 
+    def set_series(self, data, color:str='#3a7bd5'):
+        '''draws data series on both scrollbars - samples are spread evenly over all frames
+        data: 1d numpy array or SeriesDecimator - see PlotScrollBar.set_series'''
+        series = data if isinstance(data, SeriesDecimator) else SeriesDecimator(data)
+        _, min_frame, max_frame = self.MainScrollBar.get_status()
+        self.MainScrollBar.set_series(series, color=color)
+        # bottom scrollbar covers only the active region unless zoomable, but samples still span every frame
+        self.SecondaryScrollBar.set_series(series, color=color, start_frame=min_frame, end_frame=max_frame)
+
+    def clear_series(self):
+        '''removes data series from both scrollbars'''
+        self.MainScrollBar.clear_series()
+        self.SecondaryScrollBar.clear_series()
+
+    def __secondary_view(self, view_min:int, view_max:int):
+        '''called internally when bottom scrollbar is zoomed or panned - moves active region'''
+        self.MainScrollBar.update_active_fill(view_min, view_max)
+
+    def __main_preview(self, frame:int):
+        '''called internally while main scrollbar is dragged with a preview command'''
+        self.SecondaryScrollBar.set_frame(frame)
+        self.preview_command(frame)
+
+    def __secondary_preview(self, frame:int):
+        '''called internally while secondary scrollbar is dragged with a preview command'''
+        self.MainScrollBar.set_frame(frame)
+        self.preview_command(frame)
+
     def set_frame_num(self, max_frame:int, frame_rate:float, min_frame:int=0):
         '''updates the min/max frame and frame rate'''
         self.MainScrollBar.set_frame_num(max_frame, frame_rate, min_frame=min_frame)
+        if self.zoomable:
+            self.SecondaryScrollBar.set_frame_num(max_frame, frame_rate, min_frame=min_frame)
         self.MainScrollBar.update_active_fill(*self.get_active_bounds(*self.MainScrollBar.get_status(), self.secondary_width_perc))
 
     def set_frame(self, frame):
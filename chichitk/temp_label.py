@@ -22,7 +22,8 @@ class TempLabel(Label):
         self.__delay = 0.1 # arbitrary time between steps
         self.__Timer = Timer(self.__delay, callback=lambda s: None,
                              end_callback=self.__to_default,
-                             max_step=int(duration / self.__delay))
+                             max_step=int(duration / self.__delay),
+                             master=self, tk_loop=True) # no thread - label is cleared on the Tk thread
         
     def __to_default(self):
         '''called when timer reaches the end - reset label'''
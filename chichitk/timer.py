@@ -1,5 +1,122 @@
 import time
-from threading import Thread
+import math
+import heapq
+import bisect
+import inspect
+import itertools
+import traceback
+from threading import Thread, Lock, Condition
+
+
+class TimerScheduler:
+    ''' Calls functions at given deadlines from a single shared thread
+
+        Timers created with shared=True register their next step here instead
+        of running their own thread, so the number of threads stays constant
+        no matter how many timers exist. Deadlines are kept in a heap and the
+        thread sleeps until the earliest one (spinning for the last spin_time
+        seconds, like Timer's precise mode).
+
+        Functions are called one after another, so they should return quickly
+        - use Timer's master option to move slow callbacks to the Tk thread.
+
+        Use TimerScheduler.get() to get the process-wide instance.
+    '''
+    __instance = None
+    __instance_lock = Lock()
+
+    def __init__(self, spin_time:float=0.001):
+        '''
+        Parameters
+        ----------
+            :param spin_time: float - seconds before each deadline spent spinning instead of sleeping
+        '''
+        self.__spin_time = spin_time
+        self.__heap = [] # (deadline, sequence number, function)
+        self.__counter = itertools.count() # breaks ties so functions are never compared
+        self.__condition = Condition()
+        # daemon so that the process can exit - the scheduler lives for the whole process
+        self.__thread = Thread(target=self.__run, daemon=True, name='TimerScheduler')
+        self.__thread.start()
+
+    @classmethod
+    def get(cls):
+        '''returns the process-wide scheduler - created when first needed'''
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                cls.__instance = cls()
+            return cls.__instance
+
+    def schedule(self, deadline:float, function):
+        '''calls function () from the scheduler thread at deadline (time.perf_counter)'''
+        with self.__condition:
+            heapq.heappush(self.__heap, (deadline, next(self.__counter), function))
+            if self.__heap[0][2] is function: # new earliest deadline - wake thread
+                self.__condition.notify()
+
+    def __run(self):
+        '''waits for each deadline and calls the function scheduled for it'''
+        while True:
+            with self.__condition:
+                while True:
+                    remaining = self.__heap[0][0] - time.perf_counter() if self.__heap else None
+                    if remaining is not None and remaining <= self.__spin_time:
+                        break
+                    # wait is interrupted when an earlier deadline is scheduled
+                    self.__condition.wait(None if remaining is None else remaining - self.__spin_time)
+                deadline, _, function = heapq.heappop(self.__heap)
+            while time.perf_counter() < deadline:
+                pass
+            try:
+                function()
+            except Exception: # one failing timer must not stop the others
+                traceback.print_exc()
+
+
+class StepStream:
+    ''' Async iterator over the steps of a Timer running on an asyncio loop
+
+        Created with Timer.steps(). Only the latest step is kept, so a consumer
+        that is slower than the timer skips steps instead of falling behind.
+        Iteration ends when the timer stops.
+    '''
+    def __init__(self, loop):
+        '''
+        Parameters
+        ----------
+            :param loop: asyncio event loop that the timer runs on
+        '''
+        self.__loop = loop
+        self.__step = None # latest step that has not been consumed
+        self.__closed = False
+        self.__waiter = None # future awaited by __anext__ while no step is available
+
+    def push(self, step:int):
+        '''called by Timer with each step - replaces step that has not been consumed'''
+        self.__step = step
+        self.__wake()
+
+    def close(self):
+        '''called by Timer when it stops - iteration ends once the last step is consumed'''
+        self.__closed = True
+        self.__wake()
+
+    def __wake(self):
+        '''resumes __anext__ if it is waiting'''
+        if self.__waiter is not None and not self.__waiter.done():
+            self.__waiter.set_result(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> int:
+        while self.__step is None:
+            if self.__closed:
+                raise StopAsyncIteration
+            self.__waiter = self.__loop.create_future()
+            await self.__waiter
+        step, self.__step = self.__step, None
+        return step
 
 
 class Timer:
@@ -21,15 +138,56 @@ class Timer:
 
         The number of steps, and the delay between steps can be changed at any
         time (even while the timer is running)
+
+        Time is measured with time.perf_counter, which is monotonic, so the
+        timer is not affected by changes to the system clock. In precise mode,
+        each step is scheduled at an absolute deadline computed from the start
+        time, so sleep errors do not accumulate. The thread sleeps until just
+        before the deadline and then spins for the remaining time. The
+        lateness of each step is recorded and returned by get_jitter()
+
+        By default, callbacks are called from the timer's thread. If master
+        (any tk widget) is given, the thread only posts the latest step to a
+        slot that is emptied on the Tk thread with master.after(), so every
+        callback runs on the Tk thread and may safely update widgets. If the
+        callback cannot keep up, steps that were replaced before the Tk thread
+        got to them are dropped instead of queued
+
+        With shared=True, the timer has no thread of its own. Each step is
+        scheduled on the process-wide TimerScheduler at an absolute deadline,
+        as in precise mode, so starting and stopping does not create threads
+
+        With tk_loop=True (master must be given), no thread is used at all.
+        Each step is scheduled with master.after() at an absolute deadline, so
+        callbacks run on the Tk thread with the same step skipping as the
+        threaded timer when a callback takes longer than the delay
+
+        With loop (an asyncio event loop), steps are scheduled on the loop
+        instead, and callbacks may be coroutine functions. A new step is only
+        delivered once the coroutine of the previous step has finished - steps
+        in between are skipped. Steps can also be consumed with
+        'async for step in timer.steps()'. Use chichitk.async_mainloop to run
+        Tk and asyncio on the same thread
+
+        Delivered, skipped and late steps are counted, and the latency of each
+        callback (time from the step being due until its callback returned) is
+        added to a histogram - see stats(). With adaptive=True, the timer
+        measures how long the callback takes and only delivers every k-th step
+        when the callback cannot keep up, so playback slows down to a steady
+        lower rate instead of stuttering
         
         The simplest usage is a stopwatch, where delay could be 1 for seconds or
         0.001 for miliseconds. The callback will be called to increment the time
     '''
-    
+    # upper bounds (seconds) of the bins of the latency histogram - the last bin has no upper bound
+    LATENCY_BOUNDS = (0.0005, 0.001, 0.002, 0.004, 0.008, 0.016, 0.032, 0.064, 0.128, 0.256, 0.512, 1.024)
+
     def __init__(self, delay:float, callback, end_callback=None,
                  start_callback=None, stop_callback=None, skip_callback=None,
                  min_step=0, max_step=None, reset_end_start=True,
-                 track_execution_time=False):
+                 track_execution_time=False, precise=False, spin_time:float=0.002,
+                 master=None, dispatch_ms:int=None, shared=False, tk_loop=False,
+                 loop=None, adaptive=False, max_stride:int=10):
         '''sets timer with number of steps and delay, both of which can be changed later
         
         Parameters
@@ -44,6 +202,20 @@ class Timer:
             :param max_step: int - number of steps in timer (default=None - unlimited)
             :param reset_end_start: bool - If True, resets timer when starting from the end
             :param track_execution_time: bool - only use when debugging (more computationally expensive)
+                                              - prints slow callbacks - stats() is always available
+            :param precise: bool - if True, steps are scheduled at absolute deadlines and jitter is recorded
+            :param spin_time: float - in precise mode, seconds before each deadline spent spinning instead of
+                                      sleeping - higher is more accurate but uses more cpu - 0 to never spin
+            :param master: tk widget or None - if given, callbacks are called on the Tk thread
+            :param dispatch_ms: int or None - milliseconds between checks for new steps when master is
+                                              given - default is half the delay (at least 1)
+            :param shared: bool - if True, steps are scheduled on the shared TimerScheduler thread
+            :param tk_loop: bool - if True, steps are scheduled with master.after() - no threads
+            :param loop: asyncio event loop or None - if given, steps are scheduled on the loop - no threads
+                                                    - timer must only be used from the loop's thread
+            :param adaptive: bool - if True, only every k-th step is delivered when the callback takes
+                                    longer than the delay - k is adjusted as the callback speeds up or slows down
+            :param max_stride: int - largest k in adaptive mode
 
         Note
         ----
@@ -65,7 +237,28 @@ class Timer:
         self.__start_step = min_step # relevant while running
         self.__track_execution_time = track_execution_time
         self.__reset_end_start = reset_end_start
+        self.__precise, self.__spin_time = precise, spin_time
+        assert master is not None or not tk_loop, 'Timer with tk_loop requires master widget'
+        self.__shared, self.__tk_loop = shared, tk_loop
+        self.__loop = loop
+        self.__callback_task = None # task running coroutine callback (loop only)
+        self.__tasks = set() # tasks of coroutine callbacks that have not finished - the loop only keeps weak references
+        self.__streams = [] # StepStreams created by steps() (loop only)
         self.__running = False
+        self.__run_id = 0 # incremented with each start so that an old thread cannot keep running
+        self.__master, self.__dispatch_ms = master, dispatch_ms
+        self.__slot_lock = Lock()
+        self.__pending_step, self.__pending_end = None, False # filled by thread when master is given
+        self.__pending_due = None # time at which pending step was due
+        self.__dispatching = False # True while the Tk thread is checking the slot
+        assert max_stride >= 1, f'Timer max_stride must be at least 1, not {max_stride}'
+        self.__adaptive, self.__max_stride = adaptive, max_stride
+        self.__stride = 1 # every stride-th step is delivered (adaptive only)
+        self.__callback_cost = None # moving average of callback duration (adaptive only)
+        self.__last_step = None # last step computed while running - to count skipped steps
+        self.__last_posted = None # last step delivered or posted - for adaptive stride
+        self.reset_jitter()
+        self.reset_stats()
 
     def start(self):
         '''
@@ -83,12 +276,26 @@ class Timer:
             if self.at_end() and self.__reset_end_start:
                 self.__current_step = self.__min_step
             self.__running = True
-            self.__start_time = time.time()
+            self.__run_id += 1
+            self.__start_time = time.perf_counter()
             self.__last_time = self.__start_time
             self.__start_step = self.__current_step
-            Thread(target=self.__run).start()
+            self.__last_step, self.__last_posted = None, None
+            run_id = self.__run_id
+            if self.__loop is not None: # first step is called as soon as the loop is idle
+                self.__loop.call_soon(self.__loop_tick, run_id, None)
+            elif self.__tk_loop: # first step is called as soon as the Tk thread is idle
+                self.__master.after(0, lambda: self.__after_tick(run_id, None))
+            elif self.__shared: # first step is called by the scheduler thread straight away
+                TimerScheduler.get().schedule(self.__start_time, lambda: self.__scheduled_tick(run_id, None))
+            else:
+                run = self.__run_precise if self.__precise else self.__run
+                Thread(target=run, args=(run_id,)).start()
+            if self.__master is not None and not self.__tk_loop and not self.__dispatching:
+                self.__dispatching = True
+                self.__master.after(self.__get_dispatch_ms(), self.__dispatch)
             if self.__start_callback is not None:
-                self.__start_callback(self.__current_step)
+                self.__invoke(self.__start_callback, self.__current_step)
             return True
         return False
 
@@ -104,8 +311,13 @@ class Timer:
         '''
         if self.__running:
             self.__running = False
+            with self.__slot_lock: # step posted before stopping is stale
+                self.__pending_step = None
+            for stream in self.__streams:
+                stream.close()
+            self.__streams = []
             if self.__stop_callback is not None:
-                self.__stop_callback()
+                self.__invoke(self.__stop_callback)
             return True
         return False
 
@@ -119,10 +331,10 @@ class Timer:
         assert self.__max_step is not None, 'Skipped timer to end when max_step is not defined'
         self.stop()
         if self.__end_callback is not None:
-            self.__end_callback()
+            self.__invoke(self.__end_callback)
         self.__current_step = self.__max_step
         if callback:
-            self.__callback(self.__current_step)
+            self.__invoke(self.__callback, self.__current_step)
 
     def set(self, step:int):
         '''
@@ -138,8 +350,9 @@ class Timer:
             raise ValueError(f"Step is out of range: {step}.")
         self.__start_step += step - self.__current_step # for running computation
         self.__current_step = step
+        self.__last_step = None # jump is not counted as skipped steps
         if self.__skip_callback is not None:
-            self.__skip_callback(self.__current_step)
+            self.__invoke(self.__skip_callback, self.__current_step)
 
     def increment(self, inc:int, callback=False):
         '''changes current step by the given increment (can be positive or negative)
@@ -151,10 +364,11 @@ class Timer:
             inc = min(self.__max_step - self.__current_step, inc)
         self.__current_step += inc
         self.__start_step += inc # so that running step is computed correctly
+        self.__last_step = None # jump is not counted as skipped steps
         if callback and not self.__running:
-            self.__callback(self.__current_step)
+            self.__invoke(self.__callback, self.__current_step)
         if self.__skip_callback is not None:
-            self.__skip_callback(self.__current_step)
+            self.__invoke(self.__skip_callback, self.__current_step)
 
     def get_step(self) -> int:
         '''returns the current step'''
@@ -164,12 +378,17 @@ class Timer:
         '''
         Purpose:
             updates the delay between callbacks.
-            if timer is currently running, the next callback will occur
-            at the previously scheduled time, and callbacks after that will
-            reflect the updated delay
+            if timer is currently running, the step does not jump and the
+            position within the current step is kept - if the current step
+            was half over, the next step follows after half of the new delay
         Pre-conditions:
             :param delay: float - new delay between callbacks
         '''
+        if self.__running: # restart timing from the current step, moved back by the part of it that has passed
+            now = time.perf_counter()
+            elapsed = (now - self.__start_time) / self.__delay
+            self.__start_step += int(elapsed)
+            self.__start_time = now - (elapsed - int(elapsed)) * delay
         self.__delay = delay
 
     def get_delay(self) -> float:
@@ -193,13 +412,236 @@ class Timer:
         '''returns True if timer is running, otherwise False'''
         return self.__running
 
-    def __run(self):
+    def __post_step(self, step:int, due:float):
+        '''called by thread - calls callback or puts step in slot for the Tk thread
+        due is the time at which step was due (time.perf_counter)'''
+        if self.__last_step is not None and step > self.__last_step + 1:
+            self.__skipped += step - self.__last_step - 1 # deadlines missed while callback was running
+        self.__last_step = step
+        if self.__loop is not None:
+            for stream in self.__streams:
+                stream.push(step)
+        if (self.__adaptive and self.__last_posted is not None
+                and 0 < step - self.__last_posted < self.__stride):
+            self.__skipped += 1
+            self.__decimated += 1
+            return
+        if self.__loop is not None:
+            if self.__callback_task is not None and not self.__callback_task.done():
+                self.__skipped += 1 # previous coroutine callback is still running
+                return
+            self.__last_posted = step
+            self.__deliver(step, due)
+        elif self.__master is None or self.__tk_loop:
+            self.__last_posted = step
+            self.__deliver(step, due)
+        else:
+            self.__last_posted = step
+            with self.__slot_lock:
+                if self.__pending_step is not None:
+                    self.__skipped += 1 # replaced before the Tk thread got to it
+                self.__pending_step, self.__pending_due = step, due
+
+    def __deliver(self, step:int, due:float):
+        '''calls callback with step and records its latency - if it returns a
+        coroutine, it is run as a task on loop and recorded when it is done'''
+        started = time.perf_counter()
+        result = self.__callback(step)
+        if self.__loop is not None and inspect.isawaitable(result):
+            self.__callback_task = self.__start_task(result)
+            self.__callback_task.add_done_callback(lambda task: self.__record_delivery(due, started))
+        else:
+            self.__record_delivery(due, started)
+
+    def __record_delivery(self, due:float, started:float):
+        '''adds delivered step to stats - started is the time at which its callback was called'''
+        now = time.perf_counter()
+        latency = now - due
+        self.__delivered += 1
+        self.__latency_counts[bisect.bisect_left(self.LATENCY_BOUNDS, latency)] += 1
+        self.__latency_total += latency
+        self.__latency_max = max(self.__latency_max, latency)
+        if latency > self.__delay * self.__stride: # finished after the next step to deliver was due
+            self.__late += 1
+        if self.__adaptive:
+            self.__adapt(now - started)
+
+    def __adapt(self, duration:float):
+        '''updates stride from the duration of the latest callback
+        stride grows when the callback takes most of the time between delivered
+        steps and shrinks again once it would fit comfortably in a smaller stride'''
+        if self.__callback_cost is None:
+            self.__callback_cost = duration
+        else: # moving average so that a single slow callback does not change the stride
+            self.__callback_cost += 0.2 * (duration - self.__callback_cost)
+        needed = self.__callback_cost / self.__delay # steps that pass during one callback
+        if needed > 0.9 * self.__stride and self.__stride < self.__max_stride:
+            self.__stride += 1
+        elif self.__stride > 1 and needed < 0.6 * (self.__stride - 1):
+            self.__stride -= 1
+
+    def __reach_end(self):
+        '''called by thread when max_step is reached - stops timer and calls end callback'''
+        if self.__master is None or self.__tk_loop or self.__loop is not None:
+            self.stop()
+            if self.__end_callback is not None:
+                self.__invoke(self.__end_callback)
+        else: # stop and end callbacks are called by __dispatch
+            with self.__slot_lock:
+                self.__pending_step, self.__pending_end = None, True
+            self.__running = False
+
+    def __get_dispatch_ms(self) -> int:
+        '''returns milliseconds between checks of the slot'''
+        if self.__dispatch_ms is not None:
+            return self.__dispatch_ms
+        return max(1, int(self.__delay * 500))
+
+    def __dispatch(self):
+        '''called on the Tk thread while running - calls callbacks for the latest step'''
+        with self.__slot_lock:
+            step, due, end = self.__pending_step, self.__pending_due, self.__pending_end
+            self.__pending_step, self.__pending_end = None, False
+        try:
+            if step is not None:
+                self.__deliver(step, due)
+            if end:
+                if self.__stop_callback is not None:
+                    self.__invoke(self.__stop_callback)
+                if self.__end_callback is not None:
+                    self.__invoke(self.__end_callback)
+        finally: # keep dispatching even if a callback raised
+            if self.__running or self.__pending_end or self.__pending_step is not None:
+                self.__master.after(self.__get_dispatch_ms(), self.__dispatch)
+            else:
+                self.__dispatching = False
+
+    def __invoke(self, function, *args):
+        '''calls function - if it returns a coroutine, it is run as a task on loop'''
+        result = function(*args)
+        if self.__loop is not None and inspect.isawaitable(result):
+            self.__start_task(result)
+
+    def __start_task(self, coroutine):
+        '''runs coroutine of a callback as a task on loop - the task is kept
+        until it is done and an exception it raises is reported to the loop'''
+        task = self.__loop.create_task(coroutine)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__task_done)
+        return task
+
+    def __task_done(self, task):
+        '''called by loop when a callback task is done - reports its exception
+        to the loop exception handler, since nothing awaits the task'''
+        self.__tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.__loop.call_exception_handler({
+                'message': 'Exception in Timer callback task',
+                'exception': task.exception(),
+                'task': task,
+            })
+
+    def steps(self) -> StepStream:
+        '''
+        Purpose
+        -------
+            returns async iterator over the steps of the timer - only available
+            when the timer runs on an asyncio loop
+            the consumer always gets the latest step - steps are skipped if it
+            is slower than the timer - iteration ends the next time the timer stops
+
+        Example
+        -------
+            async for step in timer.steps():
+                ...
+        '''
+        assert self.__loop is not None, 'Timer.steps() requires loop'
+        stream = StepStream(self.__loop)
+        self.__streams.append(stream)
+        return stream
+
+    def stats(self) -> dict:
+        '''
+        Purpose
+        -------
+            returns counts of the steps delivered and skipped since the timer
+            was created or reset_stats() was called
+            latency is the time from a step being due until its callback
+            returned (for coroutine callbacks, until the coroutine finished)
+
+        Returns
+        -------
+            :return: dict - contains keys:
+                delivered: int - number of steps whose callback was called
+                skipped: int - number of steps that were not delivered
+                decimated: int - steps of skipped that were left out by adaptive mode
+                late: int - number of callbacks that returned after the next step to deliver was due
+                stride: int - every stride-th step is currently delivered (1 unless adaptive)
+                latency_mean: float - average latency (seconds)
+                latency_max: float - largest latency (seconds)
+                latency_bounds: tuple[float] - upper bounds of the histogram bins (seconds)
+                latency_histogram: list[int] - number of callbacks in each bin - has one more
+                                               bin than latency_bounds for larger latencies
+        '''
+        mean = self.__latency_total / self.__delivered if self.__delivered else 0.0
+        return {'delivered':self.__delivered, 'skipped':self.__skipped,
+                'decimated':self.__decimated, 'late':self.__late, 'stride':self.__stride,
+                'latency_mean':mean, 'latency_max':self.__latency_max,
+                'latency_bounds':self.LATENCY_BOUNDS,
+                'latency_histogram':list(self.__latency_counts)}
+
+    def reset_stats(self):
+        '''clears counters returned by stats() - does not change stride'''
+        self.__delivered, self.__skipped, self.__decimated, self.__late = 0, 0, 0, 0
+        self.__latency_counts = [0] * (len(self.LATENCY_BOUNDS) + 1)
+        self.__latency_total, self.__latency_max = 0.0, 0.0
+
+    def get_jitter(self) -> dict:
+        '''
+        Purpose
+        -------
+            returns statistics of how late steps were called in precise mode
+            (time between the deadline of a step and the thread waking up)
+
+        Returns
+        -------
+            :return: dict - contains keys:
+                count: int - number of steps measured
+                mean: float - average lateness (seconds)
+                std: float - standard deviation of lateness (seconds)
+                max: float - largest lateness (seconds)
+        '''
+        std = (self.__jitter_m2 / self.__jitter_count) ** 0.5 if self.__jitter_count else 0.0
+        return {'count':self.__jitter_count, 'mean':self.__jitter_mean,
+                'std':std, 'max':self.__jitter_max}
+
+    def reset_jitter(self):
+        '''clears jitter statistics'''
+        self.__jitter_count, self.__jitter_mean, self.__jitter_m2, self.__jitter_max = 0, 0.0, 0.0, 0.0
+
+    def __record_jitter(self, lateness:float):
+        '''adds lateness of a step to the running jitter statistics (Welford's algorithm)'''
+        self.__jitter_count += 1
+        diff = lateness - self.__jitter_mean
+        self.__jitter_mean += diff / self.__jitter_count
+        self.__jitter_m2 += diff * (lateness - self.__jitter_mean)
+        self.__jitter_max = max(self.__jitter_max, lateness)
+
+    def __sleep_until(self, deadline:float):
+        '''sleeps until shortly before deadline, then spins until deadline'''
+        remaining = deadline - time.perf_counter()
+        if remaining > self.__spin_time:
+            time.sleep(remaining - self.__spin_time)
+        while time.perf_counter() < deadline:
+            pass
+
+    def __run(self, run_id:int):
         '''private method to actually run timer
         private because it must always be called in a Thread
         '''
-        while self.__running:
+        while self.__running and run_id == self.__run_id:
             # compute time to wait before next iteration - approx
-            current_time = time.time()
+            current_time = time.perf_counter()
             elapsed_time = current_time - self.__last_time # since last iteration
             sleep_time = max(0, self.__delay - elapsed_time)
             self.__last_time = current_time
@@ -210,17 +652,98 @@ class Timer:
 
             # check if timer has reached the end
             if self.__max_step is not None and self.__current_step >= self.__max_step:
-                self.stop()
-                if self.__end_callback is not None:
-                    self.__end_callback()
+                self.__reach_end()
                 break
 
-            self.__callback(self.__current_step)
+            self.__post_step(self.__current_step, current_time)
 
             if self.__track_execution_time:
-                execution_time = time.time() - self.__last_time
+                execution_time = time.perf_counter() - self.__last_time
                 if execution_time > self.__delay:
                     print(f'Callback took {execution_time:.4f}s, which is longer than delay: {self.__delay:.4f}s')
 
             time.sleep(sleep_time) # wait before next iteration
 
+    def __tick(self):
+        '''computes and delivers the current step as the number of whole delays
+        since the start - returns deadline of the next step or None if the end was reached'''
+        current_time = time.perf_counter()
+        step_inc = int((current_time - self.__start_time) / self.__delay)
+        self.__current_step = int(self.__start_step + step_inc)
+
+        # check if timer has reached the end
+        if self.__max_step is not None and self.__current_step >= self.__max_step:
+            self.__reach_end()
+            return None
+
+        if self.__current_step == self.__last_step: # woke at a deadline set before set_delay made it later
+            return self.__start_time + (step_inc + 1) * self.__delay
+
+        self.__post_step(self.__current_step, self.__start_time + step_inc * self.__delay)
+
+        if self.__track_execution_time:
+            execution_time = time.perf_counter() - current_time
+            if execution_time > self.__delay:
+                print(f'Callback took {execution_time:.4f}s, which is longer than delay: {self.__delay:.4f}s')
+
+        # steps whose deadlines passed during the callback are skipped
+        deadline = self.__start_time + (step_inc + 1) * self.__delay
+        deadline += max(0, int((time.perf_counter() - deadline) / self.__delay)) * self.__delay
+        return deadline
+
+    def __run_precise(self, run_id:int):
+        '''private method to run timer in precise mode - must always be called in a Thread
+        the thread sleeps until the deadline of each step'''
+        while self.__running and run_id == self.__run_id:
+            deadline = self.__tick()
+            if deadline is None:
+                break
+            self.__sleep_until(deadline)
+            self.__record_jitter(time.perf_counter() - deadline)
+
+    def __scheduled_tick(self, run_id:int, deadline:float):
+        '''called by TimerScheduler at deadline (None for the first step) - does
+        nothing if the timer was stopped or restarted since it was scheduled'''
+        if not self.__running or run_id != self.__run_id:
+            return
+        if deadline is not None:
+            self.__record_jitter(time.perf_counter() - deadline)
+        next_deadline = self.__tick()
+        if next_deadline is not None:
+            TimerScheduler.get().schedule(next_deadline,
+                                          lambda: self.__scheduled_tick(run_id, next_deadline))
+
+    def __after_tick(self, run_id:int, deadline:float):
+        '''called on the Tk thread by master.after() at deadline (None for the first
+        step) - does nothing if the timer was stopped or restarted since it was scheduled'''
+        if not self.__running or run_id != self.__run_id:
+            return
+        if deadline is not None:
+            if time.perf_counter() < deadline: # woke up early - wait for the rest
+                self.__after(run_id, deadline)
+                return
+            self.__record_jitter(time.perf_counter() - deadline)
+        next_deadline = self.__tick()
+        if next_deadline is not None:
+            self.__after(run_id, next_deadline)
+
+    def __after(self, run_id:int, deadline:float):
+        '''schedules __after_tick at deadline - rounded up because after() only
+        has millisecond resolution and must not call the step early'''
+        ms = max(0, math.ceil((deadline - time.perf_counter()) * 1000))
+        self.__master.after(ms, lambda: self.__after_tick(run_id, deadline))
+
+    def __loop_tick(self, run_id:int, deadline:float):
+        '''called by the asyncio loop at deadline (None for the first step) - does
+        nothing if the timer was stopped or restarted since it was scheduled'''
+        if not self.__running or run_id != self.__run_id:
+            return
+        if deadline is not None:
+            if time.perf_counter() < deadline: # woke up early - wait for the rest
+                self.__loop.call_later(deadline - time.perf_counter(), self.__loop_tick, run_id, deadline)
+                return
+            self.__record_jitter(time.perf_counter() - deadline)
+        next_deadline = self.__tick()
+        if next_deadline is not None:
+            self.__loop.call_later(max(0, next_deadline - time.perf_counter()),
+                                   self.__loop_tick, run_id, next_deadline)
@@ -0,0 +1,280 @@
+from tkinter import Frame, Label, Canvas
+from threading import Lock
+
+from PIL import Image, ImageTk
+try:
+    import cv2
+except ImportError: # optional - install with pip install chichitk[video]
+    cv2 = None
+
+from .player import Player
+
+__all__ = ['VideoDecoder', 'VideoPlayer']
+
+
+class VideoDecoder:
+    ''' Reads frames of a video file with cv2.VideoCapture
+
+        Frames are returned as RGB numpy arrays resized to the size set with
+        set_size(), so that all of the work of preparing a frame happens in the
+        thread that calls read().
+
+        Seeking in a video restarts decoding at the keyframe before the target
+        frame, so a small jump forward is cheaper to decode through than to
+        seek. read() only seeks when going backwards or further ahead than
+        max_grab frames - otherwise frames in between are grabbed without
+        being converted.
+
+        cv2.VideoCapture is not thread safe - read() must only be called from
+        one thread at a time (it is locked, but concurrent reads would seek
+        back and forth)
+    '''
+    def __init__(self, filename:str, max_grab:int=None):
+        '''
+        Parameters
+        ----------
+            :param filename: str - path to video file
+            :param max_grab: int or None - furthest jump ahead that is decoded through instead of seeking
+                                         - default is 2 seconds of frames (a common keyframe interval)
+        '''
+        if cv2 is None:
+            raise ImportError('VideoDecoder requires OpenCV - install it with: pip install chichitk[video]')
+        self.__capture = cv2.VideoCapture(filename)
+        if not self.__capture.isOpened():
+            raise ValueError(f'Could not open video: {filename}')
+        self.__frame_num = int(self.__capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.__frame_rate = self.__capture.get(cv2.CAP_PROP_FPS) or 30
+        self.__video_size = (int(self.__capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                             int(self.__capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.__max_grab = max_grab if max_grab is not None else int(round(2 * self.__frame_rate))
+        self.__size = self.__video_size # size of returned frames
+        self.__position = 0 # index of the frame that the capture will read next
+        self.__last = None # (index, size, frame) of the last frame returned
+        self.__seek_count = 0
+        self.__lock = Lock()
+
+    def read(self, index:int):
+        '''returns frame index as RGB numpy array of shape (height, width, 3)
+        or None if it cannot be decoded - index is clamped to the video'''
+        with self.__lock:
+            if self.__capture is None: # closed
+                return None
+            index = max(0, min(index, self.__frame_num - 1))
+            if self.__last is not None and self.__last[0] == index and self.__last[1] == self.__size:
+                return self.__last[2]
+            jump = index - self.__position
+            if 0 < jump <= self.__max_grab: # decode through to avoid going back to the keyframe
+                for _ in range(jump):
+                    self.__capture.grab()
+            elif jump != 0:
+                self.__capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+                self.__seek_count += 1
+            self.__position = index
+            success, frame = self.__capture.read()
+            if not success:
+                return None
+            self.__position = index + 1
+            if (frame.shape[1], frame.shape[0]) != self.__size:
+                frame = cv2.resize(frame, self.__size, interpolation=cv2.INTER_AREA)
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            self.__last = (index, self.__size, frame)
+            return frame
+
+    def set_size(self, width:int, height:int):
+        '''sets size (pixels) of the frames returned by read()'''
+        self.__size = (max(1, width), max(1, height))
+
+    def get_video_size(self) -> tuple:
+        '''returns (width, height) of the video in pixels'''
+        return self.__video_size
+
+    def get_frame_num(self) -> int:
+        '''returns number of frames in the video'''
+        return self.__frame_num
+
+    def get_frame_rate(self) -> float:
+        '''returns frames per second of the video'''
+        return self.__frame_rate
+
+    def get_seek_count(self) -> int:
+        '''returns number of times read() had to seek'''
+        return self.__seek_count
+
+    def close(self):
+        '''releases video file - read() returns None afterwards'''
+        with self.__lock:
+            if self.__capture is not None:
+                self.__capture.release()
+                self.__capture = None
+
+
+class VideoPlayer(Frame):
+    ''' Plays video files
+
+        Combines a video surface with Player. Frames are decoded by
+        VideoDecoder in a single background thread and kept ready in Player's
+        ring buffer of prefetch frames, so the Tk thread only copies each
+        frame into the surface. The surface uses a single PhotoImage, which is
+        replaced only when the size of the frames changes.
+
+        Frames that are not decoded in time are dropped - the number of
+        dropped frames is shown below the video if show_dropped is True
+    '''
+    def __init__(self, master:Frame, filename:str=None, bg:str='#000000', fg:str='#ffffff',
+                 callback=None, slider_type:str='single', prefetch:int=8, max_grab:int=None,
+                 show_dropped=True, font_name:str='Segoe UI', font_size:int=9,
+                 width:int=640, height:int=360, stats_ms:int=500, resize_ms:int=100):
+        '''
+        Parameters
+        ----------
+            :param master: tk.Frame - parent widget
+            :param filename: str or None - path to video file - can be opened later with open()
+            :param bg: str (hex code) - background color
+            :param fg: str (hex code) - color of dropped frame count
+            :param callback: function (step) or None - called after each frame is shown
+            :param slider_type: str - options: ['simple', 'single', 'double'] - see Player
+            :param prefetch: int - number of decoded frames kept ready
+            :param max_grab: int or None - see VideoDecoder
+            :param show_dropped: bool - if True, number of dropped frames is shown
+            :param font_name: str - font of dropped frame count
+            :param font_size: int - font size of dropped frame count
+            :param width: int - initial width of video surface (pixels)
+            :param height: int - initial height of video surface (pixels)
+            :param stats_ms: int - milliseconds between updates of dropped frame count
+            :param resize_ms: int - milliseconds after the last resize before frames are decoded at the new size
+        '''
+        super().__init__(master, bg=bg)
+        self.__callback = callback
+        self.__max_grab = max_grab
+        self.__stats_ms, self.__resize_ms = stats_ms, resize_ms
+        self.__Decoder = None
+        self.__photo = None # reused for every frame of the same size
+        self.__resize_id = None # pending after() of __resized
+
+        self.__Player = Player(self, self.__show_frame, 1 / 30, bg=bg, slider_type=slider_type,
+                               frame_num=1, frame_rate=30, tk_timer=True, prefetch=prefetch,
+                               prefetch_workers=1, # one decode thread - VideoCapture is not thread safe
+                               coalesce_scrub=True) # decode at most once per refresh while dragging
+        self.__Player.pack(side='bottom', fill='x')
+
+        self.__Dropped = None
+        if show_dropped:
+            self.__Dropped = Label(self, bg=bg, fg=fg, anchor='e', font=(font_name, font_size))
+            self.__Dropped.pack(side='bottom', fill='x')
+            self.after(self.__stats_ms, self.__update_dropped)
+
+        # canvas instead of label so that the requested size does not follow the image
+        self.__Surface = Canvas(self, bg=bg, highlightthickness=0, width=width, height=height)
+        self.__Surface.pack(side='top', fill='both', expand=True)
+        self.__image_id = self.__Surface.create_image(width // 2, height // 2, anchor='center')
+        self.__Surface.bind('<Configure>', self.__surface_configure)
+
+        if filename is not None:
+            self.open(filename)
+
+    def open(self, filename:str):
+        '''stops playback and loads video file - shows first frame'''
+        self.__Player.stop()
+        decoder = VideoDecoder(filename, max_grab=self.__max_grab)
+        self.__Player.set_frame_provider(None) # stops decode thread before old decoder is closed
+        if self.__Decoder is not None:
+            self.__Decoder.close()
+        self.__Decoder = decoder
+        self.__fit_decoder()
+        self.__Player.set_frame_num(decoder.get_frame_num())
+        self.__Player.set_frame_rate(decoder.get_frame_rate())
+        self.__Player.set_frame_provider(decoder.read)
+        self.__Player.reset_stats()
+        self.__Player.set_frame(0)
+
+    def close(self):
+        '''stops playback and releases video file'''
+        self.__Player.stop()
+        self.__Player.set_frame_provider(None)
+        if self.__Decoder is not None:
+            self.__Decoder.close()
+            self.__Decoder = None
+
+    def start(self):
+        '''starts playback'''
+        self.__Player.start()
+
+    def stop(self):
+        '''stops playback'''
+        self.__Player.stop()
+
+    def set_frame(self, frame:int):
+        '''shows frame - decodes it if it is not ready'''
+        self.__Player.set_frame(frame)
+
+    def get_frame(self) -> int:
+        '''returns index of current frame'''
+        return self.__Player.get_step()
+
+    def get_player(self) -> Player:
+        '''returns Player that controls playback'''
+        return self.__Player
+
+    def get_dropped(self) -> int:
+        '''returns number of frames that were not shown while playing since the video was opened'''
+        stats = self.__Player.stats()
+        return stats['skipped'] + stats['not_ready']
+
+    def stats(self) -> dict:
+        '''returns playback statistics - see Player.stats()
+        also contains seeks: int - number of times the decoder had to seek'''
+        stats = self.__Player.stats()
+        stats['seeks'] = self.__Decoder.get_seek_count() if self.__Decoder is not None else 0
+        return stats
+
+    def destroy(self):
+        '''releases video file before destroying widget'''
+        self.close()
+        super().destroy()
+
+    def __show_frame(self, step:int, frame):
+        '''called by Player on the Tk thread with each frame (RGB numpy array)'''
+        height, width = frame.shape[:2]
+        if self.__photo is None or (self.__photo.width(), self.__photo.height()) != (width, height):
+            self.__photo = ImageTk.PhotoImage('RGB', (width, height), master=self)
+            self.__Surface.itemconfig(self.__image_id, image=self.__photo)
+        # frombuffer wraps the array without copying - paste copies it into the PhotoImage
+        self.__photo.paste(Image.frombuffer('RGB', (width, height), frame, 'raw', 'RGB', 0, 1))
+        if self.__callback is not None:
+            self.__callback(step)
+
+    def __fit_decoder(self):
+        '''sets decoder frame size to the largest size that fits the surface
+        while keeping the aspect ratio of the video'''
+        if self.__Decoder is None:
+            return
+        video_width, video_height = self.__Decoder.get_video_size()
+        surface_width, surface_height = self.__Surface.winfo_width(), self.__Surface.winfo_height()
+        if surface_width <= 1 or surface_height <= 1 or video_width == 0 or video_height == 0:
+            return # not mapped yet - decoded at video size until surface is configured
+        scale = min(surface_width / video_width, surface_height / video_height)
+        self.__Decoder.set_size(int(video_width * scale), int(video_height * scale))
+
+    def __surface_configure(self, event):
+        '''called when surface is resized - decoding at the new size waits until
+        resizing has stopped for resize_ms so that frames are not decoded for every step'''
+        self.__Surface.coords(self.__image_id, event.width // 2, event.height // 2)
+        if self.__resize_id is not None:
+            self.after_cancel(self.__resize_id)
+        self.__resize_id = self.after(self.__resize_ms, self.__resized)
+
+    def __resized(self):
+        '''decodes current frame at the new surface size'''
+        self.__resize_id = None
+        if self.__Decoder is None:
+            return
+        self.__fit_decoder()
+        # prepared frames have the old size - setting the frame drops them
+        self.__Player.set_frame(self.__Player.get_step(), callback=not self.__Player.is_running())
+
+    def __update_dropped(self):
+        '''updates dropped frame count - called every stats_ms'''
+        if self.__Dropped is None or not self.__Dropped.winfo_exists():
+            return
+        self.__Dropped.config(text=f'Dropped frames: {self.get_dropped()}')
+        self.after(self.__stats_ms, self.__update_dropped)